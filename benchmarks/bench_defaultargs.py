@@ -0,0 +1,497 @@
+"""
+    Benchmarks of sphinx-autodoc-defaultargs on synthetic corpora.
+
+    Times the text helpers and ``process_docstring`` for growing numbers
+    of parameters and docstring lengths, fits the growth exponent of each
+    series and optionally times full Sphinx builds. The time to import
+    the extension is checked against a budget with ``-X importtime``.
+    The peak and retained memory of processing many docstrings
+    are traced with ``tracemalloc``.
+
+    Usage, against the baseline stored in ``benchmarks/baseline.json``::
+
+        python benchmarks/bench_defaultargs.py \\
+            --baseline benchmarks/baseline.json --check
+        python benchmarks/bench_defaultargs.py \\
+            --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+import corpus
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, ROOT)
+
+import sphinx_autodoc_defaultargs as defaultargs  # noqa: E402 isort:skip
+
+
+# A dozen flag styles, the one of the corpus last
+MANY_FLAGS = [('Defaults to ', '.'), ('[default=', ']'), ('[default: ', ']'),
+              ('(default=', ')'), ('(default: ', ')'), ('Default is ', '.'),
+              ('Default: ', '.'), ('default ', ')'), ('{default: ', '}'),
+              ('<default ', '>'), ('(Defaults to ', ')'), ('(Default: ', ')')]
+
+
+# Budget of lines of the long docstrings, more than their field lists
+MAX_LINES = 200
+
+# Of seconds and bytes
+UNITS = {'us': 1e6, 'KiB': 1 / 1024}
+
+
+class BenchApp(object):
+    """Just enough of Sphinx to call ``process_docstring``."""
+
+    def __init__(self, **config):
+        self.config = types.SimpleNamespace()
+        defaultargs.setup(self)
+        vars(self.config).update(config)
+        defaultargs.init_caches(self, self.config)
+
+    def add_config_value(self, name, default, rebuild):
+        setattr(self.config, name, default)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def best_time(func, min_time=0.05, repeat=3):
+    """Best time per call of ``func()`` in seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def growth_exponent(sizes, times):
+    """Least squares slope of ``log(times)`` over ``log(sizes)``."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(t, 1e-12)) for t in times]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / sum(
+        (x - x_mean) ** 2 for x in xs)
+
+
+def import_time(module='sphinx_autodoc_defaultargs', runs=5):
+    """Best cumulative import time of ``module`` in seconds reported by
+    ``python -X importtime`` in fresh interpreters, and the names of the
+    modules imported with it."""
+    env = dict(os.environ)
+    # Time the import, not compiling the module
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [path for path in [env.get('PYTHONPATH')] if path])
+    best = float('inf')
+    imported = []
+    for i in range(runs + 1):
+        stderr = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+            env=env, stderr=subprocess.PIPE, universal_newlines=True,
+            check=True).stderr
+        imported = []
+        for line in stderr.splitlines():
+            fields = line.partition('import time:')[2].split('|')
+            if len(fields) != 3 or not fields[1].strip().isdigit():
+                continue
+            name = fields[2].strip()
+            imported.append(name)
+            # The first run may write the bytecode
+            if name == module and i:
+                best = min(best, int(fields[1]) * 1e-6)
+    return best, imported
+
+
+@contextlib.contextmanager
+def plan_cache(enabled):
+    """Use the plan cache of ``process_lines`` only if ``enabled``."""
+    maxsize = defaultargs.plan_cache.maxsize
+    if not enabled:
+        defaultargs.plan_cache.maxsize = 0
+    try:
+        yield
+    finally:
+        defaultargs.plan_cache.maxsize = maxsize
+
+
+def bench_helpers(n_params, doc_lines, style, **timing):
+    """Per call times of the text helpers on one docstring."""
+    func = corpus.make_function(n_params, doc_lines, style)
+    lines = corpus.docstring_lines(func, style)
+    args = defaultargs.get_args(func)
+    name = args[n_params // 2]
+    searchfor = [':{} {}:'.format(field, name)
+                 for field in defaultargs.param_fields]
+    text = defaultargs.match_field(lines, searchfor)[4] or lines
+    return {
+        'match_field': best_time(
+            lambda: defaultargs.match_field(lines, searchfor), **timing),
+        'find_arg': best_time(
+            lambda: defaultargs.find_arg(lines, args, name, 1), **timing),
+        'rfind_substring_in_paragraph': best_time(
+            lambda: defaultargs.rfind_substring_in_paragraph(
+                lines, '(Default: '), **timing),
+        'rfind_substring_in_paragraph[field]': best_time(
+            lambda: defaultargs.rfind_substring_in_paragraph(
+                text, '(Default: '), **timing),
+        'rfind_substring_in_paragraph[multiline]': best_time(
+            lambda: defaultargs.rfind_substring_in_paragraph(
+                lines, '(Default: ', multiline_matching=True), **timing),
+    }
+
+
+def bench_process_docstring(app, n_params, doc_lines, style, reuse=False,
+                            template=False, **timing):
+    """Time of processing a docstring, not remembered from the previous
+    call unless ``reuse``, or with the plan of the previous call
+    if ``template``."""
+    func = corpus.make_function(n_params, doc_lines, style)
+    lines = corpus.docstring_lines(func, style)
+    if reuse:
+        return best_time(lambda: defaultargs.process_docstring(
+            app, 'function', 'func', func, None, list(lines)), **timing)
+    info = defaultargs.introspect(func)
+    with plan_cache(template):
+        return best_time(lambda: defaultargs.process_lines_within_budgets(
+            app, 'function', 'func', list(lines), info), **timing)
+
+
+def bench_napoleon(app, n_params, doc_lines, style, **timing):
+    """Times of converting a docstring with napoleon and then processing
+    it, and of doing both with ``docstring_default_arg_napoleon``."""
+    from sphinx.ext.napoleon.docstring import GoogleDocstring, NumpyDocstring
+    from sphinx.util.docstrings import prepare_docstring
+
+    func = corpus.make_function(n_params, doc_lines, style)
+    lines = prepare_docstring(func.__doc__)
+
+    def separate():
+        # Like napoleon
+        converted = NumpyDocstring(lines, app.config, None, 'function',
+                                   'func', func).lines()
+        converted = GoogleDocstring(converted, app.config, None, 'function',
+                                    'func', func).lines()
+        defaultargs.process_lines(
+            app, 'function', converted, defaultargs.introspect(func))
+
+    with plan_cache(False):
+        return {
+            'napoleon+process_docstring': best_time(separate, **timing),
+            'process_napoleon_docstring': best_time(
+                lambda: defaultargs.process_napoleon_docstring(
+                    app, 'function', 'func', func, None, list(lines)),
+                **timing),
+        }
+
+
+def bench_memory(app, objects, n_params, doc_lines, style):
+    """Peak and retained bytes per 1,000 docstrings processed
+    from empty caches, traced by :mod:`tracemalloc`.
+
+    Each docstring is of a function of its own, with default values
+    of its own, which stays alive as in a build.
+    """
+    import tracemalloc
+
+    funcs = [corpus.make_function(n_params, doc_lines, style,
+                                  name='func_{}'.format(i))
+             for i in range(objects)]
+    docstrings = [corpus.docstring_lines(func, style) for func in funcs]
+    # Not the memory allocated once, e.g. compiled patterns,
+    # whether or not other benchmarks ran before
+    warm = corpus.make_function(n_params, doc_lines, style, name='warm')
+    defaultargs.process_docstring(app, 'function', warm.__name__, warm,
+                                  None, corpus.docstring_lines(warm, style))
+    for cache in [defaultargs.introspect, defaultargs.render_default,
+                  defaultargs.plan_cache, defaultargs.result_cache]:
+        cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for func, lines in zip(funcs, docstrings):
+            defaultargs.process_docstring(
+                app, 'function', func.__name__, func, None, list(lines))
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak': peak * 1e3 / objects,
+            'retained': retained * 1e3 / objects}
+
+
+def bench_build(root, jobs, style, **project):
+    """Seconds of a full text build with and without the extension."""
+    srcdir = corpus.write_project(root, style=style, **project)
+    from sphinx.cmd.build import build_main
+
+    result = {}
+    for disabled in ['1', '']:
+        os.environ['DEFAULTARGS_DISABLED'] = disabled
+        outdir = os.path.join(root, '_build', disabled or 'enabled')
+        shutil.rmtree(outdir, ignore_errors=True)
+        start = time.perf_counter()
+        status = build_main(['-b', 'text', '-q', '-E', '-j', str(jobs),
+                             srcdir, outdir])
+        result['without' if disabled else 'with'] = (
+            time.perf_counter() - start)
+        if status:
+            raise RuntimeError('Sphinx build failed')
+    del os.environ['DEFAULTARGS_DISABLED']
+    return result
+
+
+def time_style(args, style, app, record, timing):
+    """Time the series and helpers of ``style``, see :func:`run`."""
+    many_flags_app = BenchApp(always_document_default_args=True,
+                              docstring_default_arg_flags=MANY_FLAGS)
+    # Processing the field list only of long docstrings
+    budget_app = BenchApp(always_document_default_args=True,
+                          docstring_default_arg_max_lines=MAX_LINES)
+    from sphinx.ext.napoleon import Config
+    napoleon_app = BenchApp(**dict(
+        {name: default for name, (default, _)
+         in Config._config_values.items()},
+        napoleon_use_param=True, napoleon_use_rtype=True,
+        always_document_default_args=True))
+    record('process_docstring[{},params={},lines={},reused]'.format(
+        style, args.fixed_params, args.fixed_lines),
+        bench_process_docstring(app, args.fixed_params, args.fixed_lines,
+                                style, reuse=True, **timing))
+    record('process_docstring[{},params={},lines={},template]'.format(
+        style, args.fixed_params, args.fixed_lines),
+        bench_process_docstring(app, args.fixed_params, args.fixed_lines,
+                                style, template=True, **timing))
+    if style != 'rest':
+        for key, value in sorted(bench_napoleon(
+                napoleon_app, args.fixed_params, args.fixed_lines, style,
+                **timing).items()):
+            record('{}[{},params={},lines={}]'.format(
+                key, style, args.fixed_params, args.fixed_lines), value)
+    record('process_docstring[{},params={},lines={},flags={}]'.format(
+        style, args.fixed_params, args.fixed_lines, len(MANY_FLAGS)),
+        bench_process_docstring(many_flags_app, args.fixed_params,
+                                args.fixed_lines, style, **timing))
+    for n_params in args.params:
+        record('process_docstring[{},params={},lines={}]'.format(
+            style, n_params, args.fixed_lines),
+            bench_process_docstring(
+                app, n_params, args.fixed_lines, style, **timing),
+            'process_docstring[{}] vs params'.format(style), n_params)
+    for doc_lines in args.lines:
+        record('process_docstring[{},params={},lines={}]'.format(
+            style, args.fixed_params, doc_lines),
+            bench_process_docstring(
+                app, args.fixed_params, doc_lines, style, **timing),
+            'process_docstring[{}] vs lines'.format(style), doc_lines)
+        if doc_lines > MAX_LINES:
+            record('process_docstring[{},params={},lines={},'
+                   'max_lines={}]'.format(style, args.fixed_params,
+                                          doc_lines, MAX_LINES),
+                   bench_process_docstring(
+                       budget_app, args.fixed_params, doc_lines, style,
+                       **timing))
+        helpers = bench_helpers(
+            args.fixed_params, doc_lines, style, **timing)
+        for helper, value in sorted(helpers.items()):
+            record('{}[{},params={},lines={}]'.format(
+                helper, style, args.fixed_params, doc_lines), value,
+                '{}[{}] vs lines'.format(helper, style), doc_lines)
+
+
+def check_import_time(args, record):
+    """Time the import of the extension, and return it as a failure
+    if over ``--import-budget`` or if it imports Sphinx."""
+    seconds, imported = import_time(runs=args.import_runs)
+    record('import sphinx_autodoc_defaultargs', seconds)
+    heavy = sorted(name for name in imported
+                   if name.split('.')[0] in ('sphinx', 'docutils'))
+    if heavy:
+        print('import sphinx_autodoc_defaultargs also imports {}'.format(
+            ', '.join(heavy)))
+        return ['import sphinx_autodoc_defaultargs']
+    if seconds > args.import_budget * 1e-3:
+        print('import sphinx_autodoc_defaultargs over budget of {} ms'.format(
+            args.import_budget))
+        return ['import sphinx_autodoc_defaultargs']
+    return []
+
+
+def bench_scaling(root, jobs, style, **project):
+    """Seconds of full text builds with the extension, serial and with
+    ``jobs`` processes, after a build importing the package."""
+    srcdir = corpus.write_project(root, style=style, **project)
+    from sphinx.cmd.build import build_main
+
+    result = {}
+    for key, processes in [('warmup', 1), ('serial', 1),
+                           ('parallel', jobs)]:
+        outdir = os.path.join(root, '_build', key)
+        start = time.perf_counter()
+        status = build_main(['-b', 'text', '-q', '-E', '-j', str(processes),
+                             srcdir, outdir])
+        result[key] = time.perf_counter() - start
+        if status:
+            raise RuntimeError('Sphinx build failed')
+    del result['warmup']
+    return result
+
+
+def run(args):
+    results = {}
+    series = {}
+    # Seconds of serial and parallel builds by style
+    scaling = {}
+    app = BenchApp(always_document_default_args=True)
+    timing = dict(min_time=args.min_time, repeat=args.repeat)
+
+    def record(key, value, series_key=None, size=None, unit='us'):
+        results[key] = value
+        print('{:<60} {:>12.1f} {}'.format(key, value * UNITS[unit], unit))
+        if series_key is not None:
+            series.setdefault(series_key, []).append((size, value))
+
+    for style in args.styles:
+        if not args.memory_only:
+            time_style(args, style, app, record, timing)
+        for key, value in sorted(bench_memory(
+                app, args.objects, args.fixed_params, args.fixed_lines,
+                style).items()):
+            record('memory[{},params={},lines={}] {} per 1000 objects'.format(
+                style, args.fixed_params, args.fixed_lines, key), value,
+                unit='KiB')
+
+        if args.build:
+            root = tempfile.mkdtemp(prefix='defaultargs-bench-')
+            try:
+                project = dict(modules=args.modules,
+                               functions=args.functions,
+                               n_params=args.fixed_params,
+                               doc_lines=args.fixed_lines)
+                for key, value in bench_build(
+                        root, args.jobs, style, **project).items():
+                    record('build[{},j={}] {} extension'.format(
+                        style, args.jobs, key), value)
+                if args.jobs > 1:
+                    scaling[style] = bench_scaling(
+                        root, args.jobs, style, **project)
+                    for key, value in sorted(scaling[style].items()):
+                        record('build[{}] {}'.format(style, key), value)
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+
+    failures = []
+    for style, times in sorted(scaling.items()):
+        if times['parallel'] >= 0.9 * times['serial']:
+            print('build[{}] with {} processes not faster than serial'.format(
+                style, args.jobs))
+            failures.append('build[{}] parallel'.format(style))
+    if not args.memory_only:
+        failures += check_import_time(args, record)
+
+    print()
+    for key, points in sorted(series.items()):
+        sizes, times = zip(*sorted(points))
+        if len(set(sizes)) < 2:
+            continue
+        exponent = growth_exponent(sizes, times)
+        superlinear = exponent > 1 + args.slack
+        print('{:<60} growth ~ n^{:.2f}{}'.format(
+            key, exponent, '  SUPER-LINEAR' if superlinear else ''))
+        if superlinear:
+            failures.append(key)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        for key in sorted(set(results) & set(baseline)):
+            ratio = results[key] / baseline[key]
+            regressed = ratio > 1 + (args.memory_tolerance if key.startswith(
+                'memory[') else args.tolerance)
+            print('{:<60} {:>6.2f}x baseline{}'.format(
+                key, ratio, '  REGRESSION' if regressed else ''))
+            if regressed:
+                failures.append(key)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    return results, failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--styles', nargs='+', default=list(corpus.STYLES),
+                        choices=corpus.STYLES)
+    parser.add_argument('--params', nargs='+', type=int,
+                        default=[8, 16, 32, 64, 128],
+                        help='numbers of parameters of the params series')
+    parser.add_argument('--lines', nargs='+', type=int,
+                        default=[10, 100, 1000, 10000],
+                        help='numbers of filler lines of the lines series')
+    parser.add_argument('--fixed-params', type=int, default=16)
+    parser.add_argument('--fixed-lines', type=int, default=10)
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='minimum seconds of each timing loop')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--objects', type=int, default=1000,
+                        help='number of docstrings of the memory benchmark')
+    parser.add_argument('--memory-only', action='store_true',
+                        help='only trace the memory of processing '
+                        'docstrings')
+    parser.add_argument('--build', action='store_true',
+                        help='also time full Sphinx builds')
+    parser.add_argument('--modules', type=int, default=8)
+    parser.add_argument('--functions', type=int, default=50)
+    parser.add_argument('-j', '--jobs', type=int, default=1)
+    parser.add_argument('--import-budget', type=float, default=50,
+                        help='milliseconds the import of the extension '
+                        'may take')
+    parser.add_argument('--import-runs', type=int, default=5)
+    parser.add_argument('--slack', type=float, default=0.3,
+                        help='growth exponents above 1 + slack are flagged')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='slowdowns above 1 + tolerance are flagged')
+    parser.add_argument('--memory-tolerance', type=float, default=0.05,
+                        help='memory growth above 1 + tolerance is flagged')
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help='write the results as JSON')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with 1 if anything is flagged')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    _, failures = run(args)
+    return 1 if args.check and failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
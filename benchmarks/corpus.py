@@ -0,0 +1,151 @@
+"""
+    Synthetic API corpora for benchmarking sphinx-autodoc-defaultargs.
+
+    Functions have a tunable number of parameters and docstring length,
+    in reST, Google or NumPy style. Every other parameter is documented,
+    some with an existing ``(Default: ...)`` note or a type,
+    and all parameters from the fifth on are keyword-only.
+"""
+
+import os
+import textwrap
+
+STYLES = ('rest', 'google', 'numpy')
+
+FILLER = ('Lorem ipsum dolor sit amet, consectetur adipiscing elit, '
+          'sed do eiusmod tempor.')
+
+# Default values of different kinds, as source text
+DEFAULTS = ('None', '0', "'text'", '(1, 2)', '{"key": [1, 2, 3]}',
+            'frozenset({1, 2})', '1.5', 'True')
+
+
+def param_names(n_params):
+    return ['param_{}'.format(i) for i in range(n_params)]
+
+
+def docstring(n_params, doc_lines, style='rest'):
+    """Docstring of a function with ``n_params`` parameters."""
+    lines = ['Summary of the function.', '']
+    lines += [FILLER] * doc_lines
+    if doc_lines:
+        lines.append('')
+
+    documented = []
+    for i, name in enumerate(param_names(n_params)):
+        if i % 2:
+            continue
+        text = 'Description of ``{}``.'.format(name)
+        if i % 3 == 0:
+            text += ' (Default: ``{}``)'.format(DEFAULTS[i % len(DEFAULTS)])
+        documented.append((name, 'int' if i % 5 else None, text))
+
+    if style == 'rest':
+        for name, type_, text in documented:
+            lines.append(':param {}: {}'.format(name, text))
+            if type_:
+                lines.append(':type {}: {}'.format(name, type_))
+        lines += [':returns: Nothing.', ':rtype: None']
+    elif style == 'google':
+        lines.append('Args:')
+        for name, type_, text in documented:
+            lines.append('    {}{}: {}'.format(
+                name, ' ({})'.format(type_) if type_ else '', text))
+        lines += ['', 'Returns:', '    None: Nothing.']
+    elif style == 'numpy':
+        lines += ['Parameters', '----------']
+        for name, type_, text in documented:
+            lines.append('{}{}'.format(
+                name, ' : {}'.format(type_) if type_ else ''))
+            lines.append('    ' + text)
+        lines += ['', 'Returns', '-------', 'None', '    Nothing.']
+    else:
+        raise ValueError('unknown style {!r}'.format(style))
+    return '\n'.join(lines)
+
+
+def function_source(name, n_params, doc_lines, style='rest'):
+    params = []
+    for i, param in enumerate(param_names(n_params)):
+        if i and i % 4 == 0 and '*' not in params:
+            params.append('*')
+        params.append('{}={}'.format(param, DEFAULTS[i % len(DEFAULTS)]))
+    return 'def {}({}):\n{}\n    pass\n'.format(
+        name, ', '.join(params), textwrap.indent(
+            repr(docstring(n_params, doc_lines, style)), '    '))
+
+
+def make_function(n_params, doc_lines, style='rest', name='func'):
+    """A function object with its docstring."""
+    namespace = {}
+    exec(function_source(name, n_params, doc_lines, style), namespace)
+    return namespace[name]
+
+
+def docstring_lines(func, style='rest'):
+    """Lines passed to ``autodoc-process-docstring`` for ``func``.
+
+    Google and NumPy styles are converted by napoleon as in a build.
+    """
+    from sphinx.util.docstrings import prepare_docstring
+
+    lines = prepare_docstring(func.__doc__)
+    if style == 'rest':
+        return lines
+
+    from sphinx.ext.napoleon import Config
+    from sphinx.ext.napoleon.docstring import GoogleDocstring, NumpyDocstring
+    converter = GoogleDocstring if style == 'google' else NumpyDocstring
+    return converter(lines, Config(napoleon_use_param=True,
+                                   napoleon_use_rtype=True),
+                     what='function', name=func.__name__, obj=func).lines()
+
+
+def write_project(root, package='synthetic', modules=4, functions=25,
+                  n_params=8, doc_lines=5, style='rest'):
+    """Write a package and a Sphinx project documenting it under ``root``.
+
+    The extension is left out of the build
+    if ``DEFAULTARGS_DISABLED`` is set in the environment.
+
+    Returns:
+        The source directory of the Sphinx project.
+    """
+    package_dir = os.path.join(root, package)
+    os.makedirs(package_dir, exist_ok=True)
+    with open(os.path.join(package_dir, '__init__.py'), 'w') as f:
+        f.write('"""Synthetic package."""\n')
+    for i in range(modules):
+        with open(os.path.join(package_dir, 'mod_{}.py'.format(i)),
+                  'w') as f:
+            f.write('"""Synthetic module {}."""\n'.format(i))
+            for j in range(functions):
+                f.write('\n\n' + function_source(
+                    'func_{}'.format(j), n_params, doc_lines, style))
+
+    srcdir = os.path.join(root, 'docs')
+    os.makedirs(srcdir, exist_ok=True)
+    with open(os.path.join(srcdir, 'conf.py'), 'w') as f:
+        f.write(textwrap.dedent('''\
+            import os
+            import sys
+
+            sys.path.insert(0, {root!r})
+
+            extensions = ['sphinx.ext.autodoc', 'sphinx.ext.napoleon']
+            if not os.environ.get('DEFAULTARGS_DISABLED'):
+                extensions.append('sphinx_autodoc_defaultargs')
+            always_document_default_args = True
+            rst_prolog = '.. |default| replace:: Default:'
+            ''').format(root=os.path.abspath(root)))
+    toctree = []
+    for i in range(modules):
+        module = '{}.mod_{}'.format(package, i)
+        toctree.append('   ' + module)
+        with open(os.path.join(srcdir, module + '.rst'), 'w') as f:
+            f.write('{0}\n{1}\n\n.. automodule:: {0}\n   :members:\n'.format(
+                module, '=' * len(module)))
+    with open(os.path.join(srcdir, 'index.rst'), 'w') as f:
+        f.write('Synthetic\n=========\n\n.. toctree::\n\n{}\n'.format(
+            '\n'.join(toctree)))
+    return srcdir
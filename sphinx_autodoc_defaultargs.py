@@ -7,11 +7,22 @@
     :license: MIT, see LICENSE for details.
 """
 
+import ast
+import bisect
+import collections
+import functools
 import inspect
 import itertools
+import json
+import os
 import re
+import reprlib
 import sys
-from typing import Any, AnyStr, Optional, Union
+import time
+import tokenize
+import types
+import weakref
+from typing import TYPE_CHECKING, Any, AnyStr, Optional, Union
 
 if sys.version_info.major == 3 and sys.version_info.minor >= 9:
     from collections.abc import Callable, Collection, Iterable, Sequence
@@ -46,14 +57,64 @@ else:
     from collections import OrderedDict
     Pattern = type(re.compile(''))
 
-from sphinx.application import Sphinx
-from sphinx.ext.autodoc.importer import mangle
-from sphinx.util import logging
-from sphinx.util.inspect import object_description
-from sphinx.util.inspect import signature as Signature
-from sphinx.util.inspect import unwrap_all
+if TYPE_CHECKING:
+    # cProfile only in type comments
+    import cProfile  # noqa: F401
+    import pstats
 
-logger = logging.getLogger(__name__)
+    from sphinx.application import Sphinx
+
+
+# Sphinx and the modules only needed by some options are imported
+# on first use, so that the text helpers load quickly on their own,
+# e.g. in parallel workers and other tools.
+
+# The functions of ``sphinx.util.inspect`` once imported
+_sphinx_object_description = _sphinx_signature = _sphinx_unwrap_all = None
+
+
+def _import_sphinx_inspect() -> None:
+    global _sphinx_object_description, _sphinx_signature, _sphinx_unwrap_all
+    from sphinx.util import inspect as sphinx_inspect
+
+    _sphinx_object_description = sphinx_inspect.object_description
+    _sphinx_signature = sphinx_inspect.signature
+    _sphinx_unwrap_all = sphinx_inspect.unwrap_all
+
+
+def object_description(obj: Any) -> str:
+    if _sphinx_object_description is None:
+        _import_sphinx_inspect()
+    return _sphinx_object_description(obj)
+
+
+def Signature(obj: Any) -> inspect.Signature:
+    if _sphinx_signature is None:
+        _import_sphinx_inspect()
+    return _sphinx_signature(obj)
+
+
+def unwrap_all(obj: Any) -> Any:
+    if _sphinx_unwrap_all is None:
+        _import_sphinx_inspect()
+    return _sphinx_unwrap_all(obj)
+
+
+class _Logger(object):
+    """Sphinx logger of a module, created on first use."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._logger = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._logger is None:
+            from sphinx.util import logging
+            self._logger = logging.getLogger(self.name)
+        return getattr(self._logger, attr)
+
+
+logger = _Logger(__name__)
 
 # NOTE sphinx.ext.napoleon does not support 'key' field
 kw_fields = ('key', 'keyword')
@@ -65,6 +126,58 @@ other_fields = (
 )
 
 
+class Span(object):
+    """Lines ``[start, stop)`` of ``lines`` from ``column`` on.
+
+    A view of the text of a field,
+    which is only sliced from ``lines`` when accessed.
+    Indexing and iteration give the sliced lines,
+    like the list ``text`` of :func:`match_field`.
+    """
+
+    __slots__ = ('lines', 'start', 'stop', 'column')
+
+    def __init__(self, lines: Sequence[AnyStr], start: int, stop: int,
+                 column: int) -> None:
+        self.lines = lines
+        self.start = start
+        self.stop = stop
+        self.column = column
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, idx: Union[int, slice]
+                    ) -> Union[AnyStr, List[AnyStr]]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('span index out of range')
+        return self.lines[self.start + idx][self.column:]
+
+    def __iter__(self) -> Iterable[AnyStr]:
+        for i in range(self.start, self.stop):
+            yield self.lines[i][self.column:]
+
+    def __repr__(self) -> str:
+        return '<Span [{}, {}) from column {}>'.format(
+            self.start, self.stop, self.column)
+
+    def join(self, sep: AnyStr) -> AnyStr:
+        return sep.join(self)
+
+    def contains(self, substr: AnyStr, sep: AnyStr = ' ') -> bool:
+        """``substr in sep.join(self)``, without joining if possible."""
+        if sep in substr:
+            # The match might cross lines
+            return substr in self.join(sep)
+        column = self.column
+        return any(self.lines[i].find(substr, column) >= 0
+                   for i in range(self.start, self.stop))
+
+
 def match_field(
     lines: Iterable[AnyStr],
     searchfor: Union[AnyStr, Iterable[AnyStr], Pattern],
@@ -83,8 +196,27 @@ def match_field(
         matched, text)``.
         Line index is left inclusive and right exclusive.
     """
+    found, start, end, matched, span = match_field_span(
+        lines, searchfor, include_blank)
+    return found, start, end, matched, list(span) if found else None
+
+
+def match_field_span(
+    lines: Iterable[AnyStr],
+    searchfor: Union[AnyStr, Iterable[AnyStr], Pattern],
+    include_blank: bool = False,
+) -> Tuple[bool, int, int, Optional[AnyStr], Optional[Span]]:
+    """:func:`match_field` with the text as a :class:`Span`.
+
+    ``lines`` is iterated only once.
+    Unless it is a sequence, the lines of the field are kept
+    for the span, still without slicing them.
+    """
 
+    instrument.count('match_field')
     found, matched = False, None
+    # Lines of the field if ``lines`` cannot be indexed
+    field_lines = None if isinstance(lines, Sequence) else []
 
     i = -1
     for i, line in enumerate(lines):
@@ -109,6 +241,8 @@ def match_field(
                         starting_line_index = i
                         matched = search_string
                         break
+            if found and field_lines is not None:
+                field_lines.append(line)
 
         # Found the next item
         # NOTE bytes[0] is not bytes
@@ -117,6 +251,8 @@ def match_field(
         elif line and line.lstrip() == line or not line and not include_blank:
             ending_line_index = i
             break
+        elif field_lines is not None:
+            field_lines.append(line)
     else:
         # i is len(lines) - 1 if the loop goes completely
         #   or -1 if lines is empty
@@ -128,11 +264,13 @@ def match_field(
 
     # matched is `:...:`
     # should remove `:...: `
+    span = None
+    if found:
+        span = Span(lines, starting_line_index, ending_line_index,
+                    len(matched) + 1) if field_lines is None else Span(
+            field_lines, 0, len(field_lines), len(matched) + 1)
 
-    text = [line[len(matched) + 1:] for line in itertools.islice(
-        lines, starting_line_index, ending_line_index)] if found else None
-
-    return found, starting_line_index, ending_line_index, matched, text
+    return found, starting_line_index, ending_line_index, matched, span
 
 # TODO
 #   test default after a Note block
@@ -158,6 +296,10 @@ def rfind_substring_in_paragraph(lines: Iterable[AnyStr],
         substr:
             If it is empty or empty after :meth:`str.strip` and
             ``strip`` is True, the behavior is undefined.
+        multiline_matching:
+            If True, ``substr`` can also match across lines,
+            which are joined by a space and, if ``strip``,
+            stripped of surrounding whitespace.
 
     Returns:
         ``(found, is_end, match_start, match_end)``.
@@ -180,7 +322,7 @@ def rfind_substring_in_paragraph(lines: Iterable[AnyStr],
 
     last_isempty = True
     if not multiline_matching:
-        for i, line in reversed(list(enumerate(lines))):
+        for i, line in _reversed_lines(lines):
             if last_isempty:
                 last_nonempty = i
             idx_start = line.rfind(substr)
@@ -196,14 +338,176 @@ def rfind_substring_in_paragraph(lines: Iterable[AnyStr],
                 break
             last_isempty = last_isempty and strip and not line.strip()
     else:
-        raise NotImplementedError
+        # Lines are searched from the end like above, each followed by
+        # a space and the beginning of the following lines,
+        # so that a match across lines is found at the line it starts.
+        sep = b' ' if isinstance(substr, bytes) else ' '
+        pieces = []  # type: List[AnyStr]  # The lines so far, reversed
+        leads = []  # type: List[int]  # Whitespace stripped before them
+        head = None  # The following text, up to len(substr) - 1 chars
+        for i, line in _reversed_lines(lines):
+            piece = line.strip() if strip else line
+            pieces.append(piece)
+            leads.append(len(line) - len(line.lstrip()) if strip else 0)
+            window = piece if head is None else piece + sep + head
+            idx_start = window.rfind(substr)
+            if idx_start >= 0:
+                found = True
+                idx_end = idx_start + len(substr)
+                rest = sep.join(reversed(pieces))[idx_end:]
+                is_end = not (rest.strip() if strip else rest)
+                match_start = _joined_position(pieces, leads, i, idx_start)
+                match_end = _joined_position(pieces, leads, i, idx_end)
+                break
+            head = window[:max(len(substr) - 1, 0)]
 
     return found, is_end, match_start, match_end
 
 
-def get_args(func: Callable, for_sphinx: bool = True) -> List[str]:
-    signature = Signature(unwrap_all(func))
+def _reversed_lines(lines: Iterable[AnyStr]) -> Iterable[Tuple[int, AnyStr]]:
+    """``reversed(list(enumerate(lines)))``, without a copy if possible."""
+    if isinstance(lines, (Sequence, Span)):
+        return ((i, lines[i]) for i in range(len(lines) - 1, -1, -1))
+    return reversed(list(enumerate(lines)))
+
+
+def _joined_position(pieces: List[AnyStr], leads: List[int], i: int,
+                     idx: int) -> Tuple[int, int]:
+    """``(line index, column index)`` of ``idx`` in the lines from
+    ``i`` on joined by a space, see :func:`rfind_substring_in_paragraph`.
+    """
+    j = len(pieces) - 1
+    while j and idx > len(pieces[j]):
+        idx -= len(pieces[j]) + 1
+        i += 1
+        j -= 1
+    return i, idx + leads[j]
+
+
+class FlagMatcher(object):
+    """Finds an existing default by ``docstring_default_arg_flags``.
+
+    Same as trying each ``(head, tail)`` pair in order
+    with :func:`rfind_substring_in_paragraph`,
+    taking the first pair whose tail ends the paragraph
+    and whose head is found,
+    but the tails are compared with the end of the paragraph at once
+    and all remaining heads are searched in a single reverse pass,
+    skipping lines without any head by one combined regex.
+    """
+
+    def __init__(self, flags: Iterable[Tuple[str, str]], strip: bool = True,
+                 multiline_matching: bool = False) -> None:
+        self.strip = strip
+        self.multiline_matching = multiline_matching
+        self.flags = tuple((head.strip(), tail.strip()) if strip else
+                           (head, tail) for head, tail in flags)
+        heads = sorted({head for head, _ in self.flags}, key=len,
+                       reverse=True)
+        self._any_head = re.compile('|'.join(map(re.escape, heads)))
+        # Text of following lines a match might extend to
+        self._max_head = max(map(len, heads), default=0)
+        self._max_tail = max((len(tail) for _, tail in self.flags),
+                             default=0)
+
+    def _end(self, lines: Sequence[str]
+             ) -> Tuple[List[str], List[int], int, str]:
+        """The last lines, as far as a tail might start in them."""
+        pieces, leads = [], []
+        i = -1
+        text = ''
+        for i, line in _reversed_lines(lines):
+            piece = line.strip() if self.strip else line
+            pieces.append(piece)
+            leads.append(len(line) - len(line.lstrip()) if self.strip else 0)
+            if not self.multiline_matching:
+                # The last nonempty line like
+                # in :func:`rfind_substring_in_paragraph`
+                if piece or not self.strip:
+                    break
+                continue
+            text = ' '.join(reversed(pieces))
+            if len(text.rstrip() if self.strip else text) >= self._max_tail:
+                break
+        return pieces, leads, i, ' '.join(reversed(pieces))
+
+    def _find_head(self, lines: Sequence[str],
+                   candidates: List[Tuple[int, str]]
+                   ) -> Optional[Tuple[int, Tuple[int, int],
+                                       Tuple[int, int]]]:
+        """First of ``candidates`` found, with its last match."""
+        result = None
+        pieces, leads = [], []
+        following = None
+        for i, line in _reversed_lines(lines):
+            piece = line.strip() if self.strip else line
+            pieces.append(piece)
+            leads.append(len(line) - len(line.lstrip()) if self.strip else 0)
+            window = piece if following is None else (
+                piece + ' ' + following)
+            if self._any_head.search(window):
+                for k, (flag_idx, head) in enumerate(candidates):
+                    idx = window.rfind(head)
+                    if idx >= 0:
+                        result = flag_idx, _joined_position(
+                            pieces, leads, i, idx), _joined_position(
+                            pieces, leads, i, idx + len(head))
+                        # Only flags of higher priority are left
+                        candidates = candidates[:k]
+                        break
+                if not candidates:
+                    break
+            if self.multiline_matching:
+                following = window[:max(self._max_head - 1, 0)]
+        return result
+
+    def __call__(self, lines: Sequence[str]
+                 ) -> Optional[Tuple[Tuple[int, int], Tuple[int, int],
+                                     Tuple[int, int]]]:
+        """``(head_start, head_end, tail_start)`` of the matched flag,
+        in the format of :func:`rfind_substring_in_paragraph`."""
+        if not self.flags:
+            return None
+        pieces, leads, i, text = self._end(lines)
+        if self.strip:
+            text = text.rstrip()
+        candidates = [(flag_idx, head) for flag_idx, (head, tail)
+                      in enumerate(self.flags) if text.endswith(tail)]
+        if not candidates:
+            return None
+        found = self._find_head(lines, candidates)
+        if found is None:
+            return None
+        flag_idx, head_start, head_end = found
+        tail_start = _joined_position(
+            pieces, leads, i, len(text) - len(self.flags[flag_idx][1]))
+        return head_start, head_end, tail_start
+
+
+def flag_text(lines: Sequence[str], head_end: Tuple[int, int],
+              tail_start: Tuple[int, int], strip: bool = True) -> str:
+    """The documented default between the head and tail of a flag
+    found by :class:`FlagMatcher`."""
+    # what if default has \
+    if head_end[0] == tail_start[0]:
+        text = lines[head_end[0]][head_end[1]:tail_start[1]]
+    else:
+        text = ' '.join(
+            [lines[head_end[0]][head_end[1]:]] +
+            lines[head_end[0] + 1:tail_start[0]] +
+            [lines[tail_start[0]][:tail_start[1]]])
+    return text.strip() if strip else text
 
+
+@functools.lru_cache(maxsize=16)
+def flag_matcher(flags: Tuple[Tuple[str, str], ...], strip: bool = True,
+                 multiline_matching: bool = False) -> FlagMatcher:
+    """The :class:`FlagMatcher` of a configuration, compiled once."""
+    return FlagMatcher(flags, strip, multiline_matching)
+
+
+def _escaped_args(signature: inspect.Signature,
+                  for_sphinx: bool = True) -> List[str]:
     result = []
     for name, param in signature.parameters.items():
         if param.kind == inspect.Parameter.VAR_POSITIONAL:
@@ -215,10 +519,8 @@ def get_args(func: Callable, for_sphinx: bool = True) -> List[str]:
     return result
 
 
-def get_default_args(func: Callable,
-                     for_sphinx: bool = True) -> OrderedDictType[str, Any]:
-    signature = Signature(func)
-
+def _default_args(signature: inspect.Signature,
+                  for_sphinx: bool = True) -> OrderedDictType[str, Any]:
     # Backward Compatibility
     #   The built-in Parameter object is guaranteed
     #   an ordered mapping in >= 3.5.
@@ -233,6 +535,662 @@ def get_default_args(func: Callable,
     return default_args
 
 
+def get_args(func: Callable, for_sphinx: bool = True) -> List[str]:
+    info = introspect(func)
+    return list(info.args) if for_sphinx else _escaped_args(
+        info.unwrapped_signature, for_sphinx)
+
+
+def get_default_args(func: Callable,
+                     for_sphinx: bool = True) -> OrderedDictType[str, Any]:
+    info = introspect(func)
+    return OrderedDict(info.default_args) if for_sphinx else _default_args(
+        info.signature, for_sphinx)
+
+
+_missing = object()
+
+
+class DefaultSource(object):
+    """A default value as written in the source, see
+    :class:`SourceSignatures`."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, DefaultSource) and self.text == other.text
+
+    def __hash__(self) -> int:
+        return hash(self.text)
+
+    def __repr__(self) -> str:
+        return self.text
+
+
+# ``(line of the first decorator or def, signature, decorator names)``
+SourceFunction = collections.namedtuple(
+    'SourceFunction', ['lineno', 'signature', 'decorators'])
+
+
+def _source_segment(source: str, node: ast.AST) -> str:
+    # On one line, as in a field of the docstring
+    return ' '.join(line.strip() for line in ast.get_source_segment(
+        source, node).splitlines())
+
+
+def _decorator_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return '{}.{}'.format(_decorator_name(node.value), node.attr)
+    return getattr(node, 'id', '')
+
+
+def source_function(source: str, node: ast.AST) -> SourceFunction:
+    """Signature of a function definition with :class:`DefaultSource`
+    defaults."""
+    args = node.args
+    Parameter = inspect.Parameter
+    positional = [(arg, Parameter.POSITIONAL_ONLY)
+                  for arg in getattr(args, 'posonlyargs', [])]
+    positional += [(arg, Parameter.POSITIONAL_OR_KEYWORD)
+                   for arg in args.args]
+    defaults = [Parameter.empty] * (len(positional) - len(args.defaults)) + [
+        DefaultSource(_source_segment(source, default))
+        for default in args.defaults]
+    params = [Parameter(arg.arg, kind, default=default)
+              for (arg, kind), default in zip(positional, defaults)]
+    if args.vararg is not None:
+        params.append(Parameter(args.vararg.arg, Parameter.VAR_POSITIONAL))
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        params.append(Parameter(
+            arg.arg, Parameter.KEYWORD_ONLY, default=Parameter.empty
+            if default is None else DefaultSource(
+                _source_segment(source, default))))
+    if args.kwarg is not None:
+        params.append(Parameter(args.kwarg.arg, Parameter.VAR_KEYWORD))
+    return SourceFunction(
+        min([node.lineno] + [decorator.lineno
+                             for decorator in node.decorator_list]),
+        inspect.Signature(params),
+        [_decorator_name(decorator) for decorator in node.decorator_list])
+
+
+def source_functions(source: str, tree: ast.AST
+                     ) -> Dict[str, List[SourceFunction]]:
+    """Functions defined in a module by ``__qualname__``."""
+    functions = {}  # type: Dict[str, List[SourceFunction]]
+
+    def walk(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                functions.setdefault(prefix + child.name, []).append(
+                    source_function(source, child))
+                walk(child, prefix + child.name + '.<locals>.')
+            elif isinstance(child, ast.ClassDef):
+                walk(child, prefix + child.name + '.')
+            else:
+                walk(child, prefix)
+
+    walk(tree, '')
+    return functions
+
+
+def parse_source(path: str) -> Tuple[str, ast.AST]:
+    """Source and AST of a Python file, decoded like by the interpreter."""
+    with tokenize.open(path) as f:
+        source = f.read()
+    return source, ast.parse(source, path)
+
+
+class SourceSignatures(object):
+    """Signatures of Python functions read from their source files
+    with :mod:`ast`, keeping the default values as written.
+
+    Each file is parsed once per path, modification time and size,
+    and the functions of the latest ``maxsize`` files are kept.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.enabled = False
+        # path -> ((mtime, size), functions by qualname)
+        self._files = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def functions(self, path: str) -> Dict[str, List[SourceFunction]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {}
+        key = stat.st_mtime_ns, stat.st_size
+        entry = self._files.get(path)
+        if entry is not None and entry[0] == key:
+            self._files.move_to_end(path)
+            return entry[1]
+
+        try:
+            functions = source_functions(*parse_source(path))
+        except (OSError, SyntaxError, ValueError):
+            functions = {}
+        self._files[path] = key, functions
+        self._files.move_to_end(path)
+        while len(self._files) > max(self.maxsize, 0):
+            self._files.popitem(last=False)
+        return functions
+
+    def signature(self, func: Any) -> Optional[inspect.Signature]:
+        """Like ``Signature(func)`` from the source, if ``func``
+        is a plain Python function or method defined in a file."""
+        code = getattr(func, '__code__', None)
+        if not isinstance(code, types.CodeType) or getattr(
+                func, '__signature__', None) is not None or not hasattr(
+                ast, 'get_source_segment'):
+            return None
+        candidates = self.functions(code.co_filename).get(
+            getattr(func, '__qualname__', None), ())
+        for function in candidates:
+            if function.lineno == code.co_firstlineno:
+                break
+        else:
+            if len(candidates) != 1:
+                return None
+            function = candidates[0]
+        signature = function.signature
+        n_args = code.co_argcount + code.co_kwonlyargcount + bool(
+            code.co_flags & inspect.CO_VARARGS) + bool(
+            code.co_flags & inspect.CO_VARKEYWORDS)
+        if set(signature.parameters) != set(code.co_varnames[:n_args]):
+            # The file changed since it was imported
+            return None
+        if inspect.ismethod(func):
+            signature = signature.replace(
+                parameters=list(signature.parameters.values())[1:])
+        return signature
+
+    def clear(self) -> None:
+        self._files.clear()
+
+
+source_signatures = SourceSignatures()
+
+
+class SourceIntrospection(object):
+    """Introspection results of a :class:`SourceFunction`,
+    like those of :class:`Introspection` without the function."""
+
+    __slots__ = ('args', 'default_args', 'is_static')
+
+    def __init__(self, function: SourceFunction) -> None:
+        self.args = _escaped_args(function.signature)
+        self.default_args = _default_args(function.signature)
+        self.is_static = 'staticmethod' in function.decorators
+
+
+class Introspection(object):
+    """Introspection results of a callable, each computed at most once.
+
+    Only a weak reference to the callable is kept if possible,
+    and the signatures only until :meth:`compact`.
+    """
+
+    __slots__ = ('_obj', '_unwrapped', '_signature', '_unwrapped_signature',
+                 '_args', '_default_args', '_is_static', '_results')
+
+    # Processed docstrings kept per callable
+    max_results = 8
+
+    def __init__(self, obj_ref: Callable[[], Any]) -> None:
+        self._obj = obj_ref
+        self._unwrapped = self._signature = self._unwrapped_signature = \
+            self._args = self._default_args = self._is_static = _missing
+        # (key, lines, result cache key, budget exceeded) from the least
+        # to the most recently used
+        self._results = None  # type: Optional[List[tuple]]
+
+    @property
+    def unwrapped(self) -> Any:
+        """``unwrap_all(obj)``"""
+        obj = self._obj()
+        if self._unwrapped is _missing:
+            unwrapped = unwrap_all(obj)
+            # Do not keep the callable itself alive
+            self._unwrapped = None if unwrapped is obj else unwrapped
+        return obj if self._unwrapped is None else self._unwrapped
+
+    @property
+    def signature(self) -> inspect.Signature:
+        """``Signature(obj)``"""
+        if self._signature is _missing:
+            self._signature = _signature(self._obj())
+        return self._signature
+
+    @property
+    def unwrapped_signature(self) -> inspect.Signature:
+        """``Signature(unwrap_all(obj))``"""
+        if self._unwrapped_signature is _missing:
+            unwrapped = self.unwrapped
+            if self._unwrapped is None:
+                self._unwrapped_signature = self.signature
+            else:
+                self._unwrapped_signature = _signature(unwrapped)
+        return self._unwrapped_signature
+
+    @property
+    def args(self) -> List[str]:
+        """Escaped names of all arguments, see :func:`get_args`."""
+        if self._args is _missing:
+            self._args = _escaped_args(self.unwrapped_signature)
+        return self._args
+
+    @property
+    def default_args(self) -> OrderedDictType[str, Any]:
+        """See :func:`get_default_args`."""
+        if self._default_args is _missing:
+            self._default_args = _default_args(self.signature)
+        return self._default_args
+
+    @property
+    def is_static(self) -> bool:
+        """See :func:`isstaticmethod`."""
+        if self._is_static is _missing:
+            self._is_static = _isstaticmethod(self.unwrapped)
+        return self._is_static
+
+    def result(self, key: tuple) -> Optional[tuple]:
+        """``(lines, cache_key, exceeded)`` remembered under ``key``,
+        if any, see :meth:`remember`."""
+        results = self._results
+        if results is None:
+            return None
+        for i, result in enumerate(reversed(results)):
+            if result[0] == key:
+                if i:
+                    results.append(results.pop(-1 - i))
+                return result[1:]
+        return None
+
+    def remember(self, key: tuple, lines: List[str],
+                 cache_key: Optional[str] = None,
+                 exceeded: Optional[Tuple[str, bool]] = None) -> None:
+        """Remember the latest ``max_results`` processed lines,
+        with their key in :class:`ResultCache` and the budget exceeded
+        processing them (see :func:`process_lines_within_budgets`)."""
+        if self._results is None:
+            self._results = []
+        self._results.append((key, tuple(lines), cache_key, exceeded))
+        del self._results[:-self.max_results]
+
+    def compact(self) -> None:
+        """Drop the signatures once the arguments are known.
+
+        They hold the default values and much more,
+        and are computed again if needed.
+        """
+        if self._args is not _missing and self._default_args is not _missing:
+            self._signature = self._unwrapped_signature = _missing
+
+
+def _signature(obj: Any) -> inspect.Signature:
+    signature = source_signatures.signature(
+        obj) if source_signatures.enabled else None
+    if signature is None:
+        if obj in no_signature:
+            raise ValueError('no signature found for {!r}'.format(obj))
+        instrument.count('Signature')
+        try:
+            signature = Signature(obj)
+        except (TypeError, ValueError):
+            signature = fallback_signature(obj)
+            if signature is None:
+                no_signature.add(obj)
+                raise
+    return signature
+
+
+# The leading ``$self``, ``$type`` or ``$module`` of a text signature
+_self_parameter = re.compile(r'\(\s*\$(\w+)\s*(,\s*/\s*)?(,\s*)?')
+
+# ``name(params) -> result`` on the first lines of a docstring
+_doc_signature = re.compile(
+    r'\s*(?:async\s+)?(?:[\w.]+\.)?(\w+)\s*(\(.*\))\s*(?:->.*)?$')
+
+
+def parse_signature(params: str) -> Optional[inspect.Signature]:
+    """Signature of the parenthesized ``params`` of a definition,
+    with :class:`DefaultSource` defaults, or None if not valid."""
+    if not hasattr(ast, 'get_source_segment'):
+        return None
+    source = 'def _{}: pass'.format(params)
+    try:
+        node = ast.parse(source).body[0]
+        return source_function(source, node).signature
+    except (SyntaxError, ValueError):
+        return None
+
+
+def text_signature(obj: Any) -> Optional[inspect.Signature]:
+    """Signature of ``obj.__text_signature__`` of a builtin,
+    like :mod:`inspect` but keeping the defaults as written."""
+    text = getattr(obj, '__text_signature__', None)
+    if not isinstance(text, str):
+        return None
+    match = _self_parameter.match(text)
+    if match is not None:
+        if getattr(obj, '__self__', None) is not None:
+            # Bound to an object or a module
+            text = '(' + text[match.end():]
+        else:
+            text = text.replace('$', '', 1)
+    return parse_signature(text)
+
+
+def docstring_signature(obj: Any) -> Optional[inspect.Signature]:
+    """Signature of the first ``name(params)`` line of the docstring
+    that is valid Python, as written for many builtins."""
+    doc = getattr(obj, '__doc__', None)
+    if not isinstance(doc, str):
+        return None
+    name = getattr(obj, '__name__', None)
+    for line in doc.lstrip().splitlines():
+        match = _doc_signature.match(line)
+        if match is None:
+            break
+        if name is None or match.group(1) == name:
+            signature = parse_signature(match.group(2))
+            if signature is not None:
+                return signature
+    return None
+
+
+def fallback_signature(obj: Any) -> Optional[inspect.Signature]:
+    """Signature of ``obj`` if :func:`Signature` fails,
+    from ``__text_signature__``, the docstring, then ``__signature__``."""
+    signature = text_signature(obj)
+    if signature is None:
+        signature = docstring_signature(obj)
+    if signature is None:
+        signature = getattr(obj, '__signature__', None)
+        if not isinstance(signature, inspect.Signature):
+            return None
+    return signature
+
+
+def qualified_name(obj: Any) -> Optional[str]:
+    """``module.qualname`` of ``obj``, unless local or without one."""
+    qualname = getattr(obj, '__qualname__', None)
+    module = getattr(obj, '__module__', None)
+    if module is None:
+        # Methods of builtin classes
+        module = getattr(getattr(obj, '__objclass__', None),
+                         '__module__', None)
+    if not isinstance(qualname, str) or not isinstance(
+            module, str) or '<' in qualname:
+        return None
+    return '{}.{}'.format(module, qualname)
+
+
+class NoSignatureCache(object):
+    """Names of the callables without any signature, see :func:`_signature`.
+
+    Callables are named ``module.qualname``, so that they are skipped
+    in later builds too, as the names are kept in the environment
+    (see :func:`init_no_signature`). Callables without such a name,
+    e.g. local functions, are not cached.
+    Each name maps to the :meth:`fingerprint` of its callable,
+    so that another object of the same name, or the callable once
+    it has a signature, e.g. after an upgrade, is not skipped.
+    """
+
+    def __init__(self) -> None:
+        self.names = {}  # type: Dict[str, str]
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    name = staticmethod(qualified_name)
+
+    @staticmethod
+    def fingerprint(obj: Any) -> str:
+        """Digest of what a signature of ``obj`` is searched in,
+        and of this module."""
+        import hashlib
+
+        data = repr((code_digest(), type(obj).__qualname__,
+                     getattr(obj, '__text_signature__', None),
+                     getattr(obj, '__signature__', None) is not None,
+                     getattr(obj, '__doc__', None)))
+        return hashlib.sha1(data.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def __contains__(self, obj: Any) -> bool:
+        if not self.names:
+            return False
+        fingerprint = self.names.get(self.name(obj))
+        found = fingerprint is not None and (
+            fingerprint == self.fingerprint(obj))
+        self.hits += found
+        return found
+
+    def add(self, obj: Any) -> None:
+        name = self.name(obj)
+        if name is not None:
+            self.names[name] = self.fingerprint(obj)
+
+    def clear(self) -> None:
+        self.names.clear()
+        self.hits = 0
+
+
+no_signature = NoSignatureCache()
+
+
+# What the methods of ``IntrospectionCache`` entries are bound to
+class _BoundClass(object):
+    pass
+
+
+_bound_self = _BoundClass()
+
+
+class IntrospectionCache(object):
+    """Bounded cache of :class:`Introspection`, keyed weakly by callable.
+
+    Entries are dropped as soon as the callable is garbage collected,
+    or in least recently used order beyond ``maxsize`` entries.
+    Callables not supporting weak references are not cached.
+    Bound methods, e.g. classmethods, are bound anew on each access,
+    so they share the entry of their function bound to a class,
+    or bound to an instance.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # (id(obj), what it is bound to) -> (weak reference to obj keyed
+        # by the same, Introspection), ``obj`` being the function
+        # of bound methods
+        self._entries = collections.OrderedDict()
+        entries = self._entries
+        # A single callback for all references
+        self._remove = lambda ref: entries.pop(ref.key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(obj: Any) -> Tuple[tuple, Any]:
+        """The key of ``obj`` and the object referenced for it."""
+        if inspect.ismethod(obj):
+            # Unlike to an instance, methods bound to a class are
+            # unwrapped to their function by ``unwrap_all``
+            return (id(obj.__func__), _BoundClass if inspect.isclass(
+                obj.__self__) else _bound_self), obj.__func__
+        return (id(obj), None), obj
+
+    def __call__(self, obj: Any) -> Introspection:
+        key, target = self._key(obj)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is target:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        entries = self._entries
+        try:
+            ref = weakref.KeyedRef(target, self._remove, key)
+        except TypeError:
+            return Introspection(lambda: obj)
+
+        bound_to = key[1]
+        if bound_to is None:
+            info = Introspection(ref)
+        else:
+            # Any class or instance gives the same signature
+            info = Introspection(lambda: types.MethodType(ref(), bound_to))
+        entries[key] = ref, info
+        while len(entries) > max(self.maxsize, 0):
+            entries.popitem(last=False)
+        return info
+
+    def __contains__(self, obj: Any) -> bool:
+        key, target = self._key(obj)
+        entry = self._entries.get(key)
+        return entry is not None and entry[0]() is target
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+introspect = IntrospectionCache()
+
+
+def _reference(obj: Any) -> Callable[[], Any]:
+    """A weak reference to ``obj`` if supported, otherwise a strong one."""
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return lambda: obj
+
+
+class DefaultRenderer(object):
+    """Describes default values for the docstring.
+
+    Values are described by the renderer registered for the closest
+    class in their MRO, or :func:`object_description`.
+    Descriptions longer than ``max_length`` are truncated,
+    and large builtin containers are only partially described.
+    The latest ``maxsize`` descriptions are memoized by value identity,
+    e.g. for sentinels shared by many functions,
+    holding the values weakly if possible.
+    """
+
+    containers = (dict, list, tuple, set, frozenset)
+
+    def __init__(self, max_length: Optional[int] = None,
+                 maxsize: int = 1024) -> None:
+        self.max_length = max_length
+        self.maxsize = maxsize
+        # Class or ``'module.QualName'`` -> renderer
+        self.renderers = {}  # type: Dict[Union[type, str], Callable]
+        # Changed with the registered renderers
+        self.generation = 0
+        self._by_type = {}  # type: Dict[type, Callable]
+        # id(value) -> (reference to value, description)
+        self._memo = collections.OrderedDict()
+
+    def register(self, cls: Union[type, str],
+                 renderer: Callable[[Any], str]) -> None:
+        """Describe instances of ``cls`` by ``renderer(value)``.
+
+        ``cls`` can be given as ``'module.QualName'``
+        to avoid importing the module in ``conf.py``.
+        """
+        self.renderers[cls] = renderer
+        self.generation += 1
+        self.clear()
+
+    def clear(self) -> None:
+        self._by_type.clear()
+        self._memo.clear()
+
+    def renderer(self, cls: type) -> Callable[[Any], str]:
+        try:
+            return self._by_type[cls]
+        except KeyError:
+            pass
+        # Defaults read from the source are described as written
+        renderer = repr if issubclass(cls, DefaultSource) else None
+        for klass in inspect.getmro(cls) if renderer is None else ():
+            renderer = self.renderers.get(klass, self.renderers.get(
+                '{}.{}'.format(klass.__module__, klass.__qualname__)))
+            if renderer is not None:
+                break
+        self._by_type[cls] = renderer
+        return renderer
+
+    def describe(self, value: Any) -> str:
+        """Description of ``value`` without memoization."""
+        renderer = self.renderer(type(value))
+        max_length = self.max_length
+        if renderer is not None:
+            text = renderer(value)
+        elif max_length and isinstance(value, self.containers) and (
+                len(value) > max_length):
+            # Each item takes at least one character
+            bounded = reprlib.Repr()
+            bounded.maxlevel = 2
+            bounded.maxdict = bounded.maxlist = bounded.maxtuple = \
+                bounded.maxset = bounded.maxfrozenset = max_length
+            bounded.maxstring = bounded.maxother = max_length
+            text = bounded.repr(value)
+        else:
+            instrument.count('object_description')
+            text = object_description(value)
+        if max_length and len(text) > max_length:
+            text = text[:max(max_length - 3, 0)] + '...'
+        return text
+
+    def __call__(self, value: Any) -> str:
+        key = id(value)
+        entry = self._memo.get(key)
+        if entry is not None and entry[0]() is value:
+            self._memo.move_to_end(key)
+            return entry[1]
+        text = self.describe(value)
+        if self.maxsize > 0:
+            self._memo[key] = _reference(value), text
+            while len(self._memo) > self.maxsize:
+                self._memo.popitem(last=False)
+        return text
+
+
+render_default = DefaultRenderer()
+register_default_renderer = render_default.register
+
+
+def format_default(default: Any) -> str:
+    # what if default has \
+    return ':code:`{}`'.format(render_default(default))
+
+
+@functools.lru_cache(maxsize=4096)
+def arg_pattern(template: str, arg: str) -> Pattern:
+    """``template`` of :func:`find_arg` for ``arg``, compiled once."""
+    # If not lstrip, \ must be replaced by \\, because
+    # the regex pattern will treat \ as an escape indicator.
+    arg = arg.lstrip(r'\*').replace('\\', '\\\\')
+    return re.compile(template.format(arg))
+
+
 def find_arg(
     lines: Collection[str], args: Sequence[str], arg: str, incr: int,
     template: str = r':\S+ [\*\\]*{}:',
@@ -250,18 +1208,15 @@ def find_arg(
         the type of next argument if found)
     """
 
+    instrument.count('find_arg')
     if arg not in args:
         return None, None
 
     nextarg_idx = args.index(arg) + incr
 
     for nextarg in args[nextarg_idx:]:
-        # If not lstrip, \ must be replaced by \\, because
-        # the regex pattern will treat \ as an escape indicator.
-        nextarg = nextarg.lstrip(r'\*')
         found, start, _, matched = match_field(
-            lines, re.compile(template.format(nextarg.replace('\\', '\\\\')))
-        )[:4]
+            lines, arg_pattern(template, nextarg))[:4]
         if found:
             return start, matched.split(' ')[0][1:]
 
@@ -269,17 +1224,13 @@ def find_arg(
     # Other fields might come before param field
     prev_line_idx = 0
     for prevarg in reversed(args[:nextarg_idx]):
-        prevarg = prevarg.lstrip(r'\*')
         found, start = match_field(
-            lines, re.compile(template.format(prevarg.replace('\\', '\\\\')))
-        )[:2]
+            lines, arg_pattern(template, prevarg))[:2]
         if found:
             prev_line_idx = start
             break
 
-    start = match_field(
-        lines[prev_line_idx:], [':{}'.format(field) for field in other_fields]
-    )[1]
+    start = match_field(lines[prev_line_idx:], other_field_prefixes)[1]
 
     # Should return len(lines) if nextarg not found
     return start + prev_line_idx, None
@@ -293,179 +1244,2008 @@ def find_curr_arg(*args, **kwargs) -> Tuple[Optional[int], Optional[str]]:
     return find_arg(*args, incr=0, **kwargs)
 
 
+# Same field shape as the ``find_arg`` template, i.e. ``:name arg:``.
+_field_head = re.compile(r':(\S+) ([^:]*):')
+other_field_prefixes = tuple(':{}'.format(field) for field in other_fields)
+
+# Line kinds, regarding the end of a field (see ``match_field``)
+_TEXT, _EMPTY, _TOPLEVEL = range(3)
+
+
+def _line_kind(line: str) -> int:
+    if not line:
+        return _EMPTY
+    return _TOPLEVEL if line.lstrip() == line else _TEXT
+
+
+def _line_key(line: str) -> Tuple[int, Optional[str], bool]:
+    """Everything of ``line`` the :class:`FieldIndex` depends on."""
+    kind = _line_kind(line)
+    if kind != _TOPLEVEL or not line.startswith(':'):
+        return kind, None, False
+    match = _field_head.match(line)
+    return (kind, match.group(0) if match else None,
+            line.startswith(other_field_prefixes))
+
+
+class Field(object):
+    """A line starting with ``:`` and the lines belonging to it.
+
+    ``end`` stops at the first empty line, ``end_blank`` does not
+    (see ``include_blank`` of :func:`match_field`).
+    ``name`` and ``arg`` are None if the line is not ``:name arg:``.
+    Line numbers of ``shifted`` fields lag behind by the pending shift
+    of their :class:`FieldIndex`, use :meth:`FieldIndex.start` and
+    :meth:`FieldIndex.end` to read them.
+    """
+
+    __slots__ = ('start', 'end', 'end_blank', 'name', 'arg', 'key',
+                 'matched', 'is_other', 'shifted')
+
+    def __init__(self, start: int, line: str) -> None:
+        self.start = start
+        self.end = self.end_blank = None
+        match = _field_head.match(line)
+        if match:
+            self.name, self.arg = match.groups()
+            # ``find_arg`` ignores leading ``*`` and ``\``
+            self.key = self.arg.lstrip(r'\*')
+            self.matched = match.group(0)
+        else:
+            self.name = self.arg = self.key = self.matched = None
+        self.is_other = line.startswith(other_field_prefixes)
+        self.shifted = False
+
+    def __repr__(self) -> str:
+        return '<Field {!r} [{}, {}|{}){}>'.format(
+            self.matched, self.start, self.end, self.end_blank,
+            ' shifted' if self.shifted else '')
+
+
+class EditBuffer(object):
+    """Edits of docstring ``lines``, applied in one splice by :meth:`apply`.
+
+    Supports the list operations :class:`FieldIndex` uses.
+    Indices are those of the edited lines,
+    while ``lines`` is unchanged until :meth:`apply`.
+    """
+
+    def __init__(self, lines: List[str]) -> None:
+        self.lines = lines
+        self._reset()
+
+    def _reset(self) -> None:
+        # Pieces of the edited lines in order, ``(source, start, stop)``.
+        # ``source`` is either ``lines`` or a list of inserted lines.
+        self._pieces = [(self.lines, 0, len(self.lines))]
+        # Replaced lines of ``lines`` by their original indices
+        self._replaced = {}  # type: Dict[int, str]
+        # Cumulative lengths of the first pieces, extended on demand
+        # and truncated at the first changed piece, so that edits
+        # moving down the docstring do not recount the pieces above.
+        self._ends = []  # type: List[int]
+        self._len = len(self.lines)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterable[str]:
+        for source, start, stop in self._pieces:
+            if source is self.lines:
+                for i in range(start, stop):
+                    yield self._replaced.get(i, source[i])
+            else:
+                for i in range(start, stop):
+                    yield source[i]
+
+    def _locate(self, idx: int) -> Tuple[int, int]:
+        """Index of the piece containing line ``idx`` and the offset."""
+        ends = self._ends
+        if ends and idx < ends[-1]:
+            piece_idx = bisect.bisect_right(ends, idx)
+        else:
+            total = ends[-1] if ends else 0
+            piece_idx = len(ends)
+            for source, start, stop in itertools.islice(
+                    self._pieces, piece_idx, None):
+                total += stop - start
+                ends.append(total)
+                if total > idx:
+                    break
+                piece_idx += 1
+        _, start, stop = self._pieces[piece_idx]
+        return piece_idx, idx - ends[piece_idx] + stop - start
+
+    def _split(self, idx: int) -> int:
+        """Split pieces at line ``idx``, return index of the next piece."""
+        if idx >= self._len:
+            return len(self._pieces)
+        piece_idx, offset = self._locate(idx)
+        if offset:
+            source, start, stop = self._pieces[piece_idx]
+            self._pieces[piece_idx:piece_idx + 1] = [
+                (source, start, start + offset),
+                (source, start + offset, stop)]
+            del self._ends[piece_idx:]
+            piece_idx += 1
+        return piece_idx
+
+    def __getitem__(self, idx: int) -> str:
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError('line index out of range')
+        piece_idx, offset = self._locate(idx)
+        source, start, _ = self._pieces[piece_idx]
+        if source is self.lines:
+            return self._replaced.get(start + offset, source[start + offset])
+        return source[start + offset]
+
+    def __setitem__(self, idx: int, line: str) -> None:
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError('line index out of range')
+        piece_idx, offset = self._locate(idx)
+        source, start, _ = self._pieces[piece_idx]
+        if source is self.lines:
+            self._replaced[start + offset] = line
+        else:
+            source[start + offset] = line
+
+    def __delitem__(self, idx: slice) -> None:
+        start, stop, step = idx.indices(self._len)
+        if step != 1:
+            raise ValueError('only contiguous lines can be deleted')
+        if start >= stop:
+            return
+        first = self._split(start)
+        last = self._split(stop)
+        del self._pieces[first:last]
+        del self._ends[first:]
+        self._len -= stop - start
+
+    def insert(self, idx: int, line: str) -> None:
+        idx = max(0, min(idx + self._len if idx < 0 else idx, self._len))
+        piece_idx = self._split(idx)
+        if piece_idx:
+            # Extend the previous insertion if it ends here
+            source, start, stop = self._pieces[piece_idx - 1]
+            if source is not self.lines and stop == len(source):
+                source.append(line)
+                self._pieces[piece_idx - 1] = source, start, stop + 1
+                del self._ends[piece_idx - 1:]
+                self._len += 1
+                return
+        self._pieces.insert(piece_idx, ([line], 0, 1))
+        del self._ends[piece_idx:]
+        self._len += 1
+
+    def plan(self) -> List[Tuple[str, int, Any]]:
+        """The edits against the original ``lines``, in order.
+
+        ``('delete', start, stop)``, ``('replace', index, line)``
+        and ``('insert', index, inserted_lines)``,
+        with all indices of the original ``lines``.
+        """
+        result = []
+        pos = 0
+        for source, start, stop in self._pieces:
+            if source is self.lines:
+                if start > pos:
+                    result.append(('delete', pos, start))
+                result.extend(('replace', i, self._replaced[i])
+                              for i in range(start, stop)
+                              if i in self._replaced)
+                pos = stop
+            elif start < stop:
+                result.append(('insert', pos, source[start:stop]))
+        if pos < len(self.lines):
+            result.append(('delete', pos, len(self.lines)))
+        return result
+
+    def apply(self) -> None:
+        """Write all edits to ``lines`` at once."""
+        if len(self._pieces) != 1 or self._replaced or (
+                self._len != len(self.lines)):
+            self.lines[:] = list(self)
+        self._reset()
+
+    def __repr__(self) -> str:
+        return '<EditBuffer {!r}>'.format(self.plan())
+
+
+class FieldIndex(object):
+    """All fields of docstring ``lines``, found in a single scan.
+
+    Answers the queries of :func:`match_field` and :func:`find_arg`
+    without rescanning ``lines``.
+    Lines must be inserted, deleted or replaced through the index
+    so that it stays consistent with ``lines``.
+
+    Fields after the last edit are not moved one by one.
+    They are marked ``shifted`` and share a pending shift instead,
+    which is only applied to the fields an edit moves past,
+    so edits moving down the docstring cost constant time on average.
+    """
+
+    def __init__(self, lines: List[str]) -> None:
+        self.lines = lines
+        self.fields = []  # type: List[Field]
+        # Fields of the same ``Field.key`` in line order
+        self._by_key = {}  # type: Dict[str, List[Field]]
+        # Fields in ``other_fields`` in line order
+        self._others = []  # type: List[Field]
+        # ``fields[_gap:]`` are shifted, they start ``_shift`` lines later
+        self._gap = 0
+        self._shift = 0
+
+        current = None
+        for i, line in enumerate(lines):
+            kind = _line_kind(line)
+            if kind == _TEXT:
+                continue
+            if current is not None:
+                if current.end is None:
+                    current.end = i
+                if kind == _TOPLEVEL:
+                    current.end_blank = i
+                    current = None
+            if kind == _TOPLEVEL and line.startswith(':'):
+                current = Field(i, line)
+                self.fields.append(current)
+                self._add(current)
+        if current is not None:
+            if current.end is None:
+                current.end = len(lines)
+            current.end_blank = len(lines)
+        self._gap = len(self.fields)
+
+    def _add(self, field: Field) -> None:
+        """Add ``field`` to the lookups other than ``fields``."""
+        if field.key is not None:
+            same_key = self._by_key.setdefault(field.key, [])
+            same_key.insert(self._bisect(same_key, self.start(field)), field)
+        if field.is_other:
+            self._others.insert(
+                self._bisect(self._others, self.start(field)), field)
+
+    def _remove(self, field: Field) -> None:
+        if field.key is not None:
+            self._by_key[field.key].remove(field)
+        if field.is_other:
+            self._others.remove(field)
+
+    def _bisect(self, fields: Sequence[Field], idx: int) -> int:
+        """Index of the first of ``fields`` starting at line ``idx`` or
+        later."""
+        lo, hi = 0, len(fields)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.start(fields[mid]) < idx:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _move_gap(self, gap: int) -> None:
+        """Apply the pending shift to ``fields[:gap]`` only."""
+        fields, shift = self.fields, self._shift
+        for field in itertools.islice(fields, self._gap, gap):
+            field.start += shift
+            field.end += shift
+            field.end_blank += shift
+            field.shifted = False
+        for field in itertools.islice(fields, gap, self._gap):
+            field.start -= shift
+            field.end -= shift
+            field.end_blank -= shift
+            field.shifted = True
+        self._gap = gap
+
+    def _scan_end(self, idx: int, include_blank: bool) -> int:
+        lines = self.lines
+        while idx < len(lines):
+            kind = _line_kind(lines[idx])
+            if kind == _TOPLEVEL or kind == _EMPTY and not include_blank:
+                break
+            idx += 1
+        return idx
+
+    def start(self, field: Field) -> int:
+        return field.start + self._shift if field.shifted else field.start
+
+    def end(self, field: Field, include_blank: bool = False) -> int:
+        end = field.end_blank if include_blank else field.end
+        return end + self._shift if field.shifted else end
+
+    def find(self, names: Collection[str], arg: str) -> Optional[Field]:
+        """The first field ``:name arg:`` with ``name`` in ``names``.
+
+        Equivalent to :func:`match_field` with
+        ``[':{} {}:'.format(name, arg) for name in names]``.
+        """
+        instrument.count('match_field')
+        for field in self._by_key.get(arg.lstrip(r'\*'), ()):
+            if field.arg == arg and field.name in names:
+                return field
+        return None
+
+    def text(self, field: Field, include_blank: bool = False) -> List[str]:
+        """Text of the field as returned by :func:`match_field`."""
+        return list(self.span(field, include_blank))
+
+    def span(self, field: Field, include_blank: bool = False) -> Span:
+        """Text of the field as returned by :func:`match_field_span`.
+
+        The span is only valid until the next edit.
+        """
+        return Span(self.lines, self.start(field),
+                    self.end(field, include_blank), len(field.matched) + 1)
+
+    def find_arg(self, args: Sequence[str], arg: str,
+                 incr: int) -> Tuple[Optional[int], Optional[str]]:
+        """Same as :func:`find_arg` with the default template."""
+        instrument.count('find_arg')
+        if arg not in args:
+            return None, None
+
+        nextarg_idx = args.index(arg) + incr
+
+        for nextarg in args[nextarg_idx:]:
+            same_key = self._by_key.get(nextarg.lstrip(r'\*'))
+            if same_key:
+                return self.start(same_key[0]), same_key[0].name
+
+        prev_line_idx = 0
+        for prevarg in reversed(args[:nextarg_idx]):
+            same_key = self._by_key.get(prevarg.lstrip(r'\*'))
+            if same_key:
+                prev_line_idx = self.start(same_key[0])
+                break
+
+        idx = self._bisect(self._others, prev_line_idx)
+        if idx < len(self._others):
+            return self.start(self._others[idx]), None
+        return len(self.lines), None
+
+    def insert(self, idx: int, line: str) -> None:
+        """``lines.insert(idx, line)``"""
+        self.lines.insert(idx, line)
+        gap = self._bisect(self.fields, idx)
+        self._move_gap(gap)
+        self._shift += 1
+
+        kind = _line_kind(line)
+        if gap:
+            # The line is inserted after the previous field starts,
+            # no field before it reaches this far.
+            field = self.fields[gap - 1]
+            if kind == _TEXT:
+                if field.end >= idx:
+                    field.end += 1
+                if field.end_blank >= idx:
+                    field.end_blank += 1
+            elif kind == _EMPTY:
+                field.end = min(field.end, idx)
+                if field.end_blank >= idx:
+                    field.end_blank += 1
+            else:
+                field.end = min(field.end, idx)
+                field.end_blank = min(field.end_blank, idx)
+        if kind == _TOPLEVEL and line.startswith(':'):
+            field = Field(idx, line)
+            field.end = self._scan_end(idx + 1, False)
+            field.end_blank = self._scan_end(idx + 1, True)
+            self.fields.insert(gap, field)
+            self._gap += 1
+            self._add(field)
+
+    def delete(self, start: int, stop: int) -> None:
+        """``del lines[start:stop]``"""
+        stop = max(start, min(stop, len(self.lines)))
+        if start >= stop:
+            return
+        gap = self._bisect(self.fields, start)
+        self._move_gap(gap)
+        deleted = self._bisect(self.fields, stop)
+        for field in self.fields[gap:deleted]:
+            self._remove(field)
+        del self.fields[gap:deleted]
+        del self.lines[start:stop]
+        n = stop - start
+        self._shift -= n
+
+        if gap:
+            field = self.fields[gap - 1]
+            if field.end >= stop:
+                field.end -= n
+            elif field.end >= start:
+                # The empty line ending the field is deleted
+                field.end = self._scan_end(start, False)
+            if field.end_blank >= stop:
+                field.end_blank -= n
+            elif field.end_blank >= start:
+                field.end_blank = self._scan_end(start, True)
+
+    def replace(self, idx: int, line: str) -> None:
+        """``lines[idx] = line``"""
+        if _line_key(self.lines[idx]) == _line_key(line):
+            self.lines[idx] = line
+        else:
+            self.delete(idx, idx + 1)
+            self.insert(idx, line)
+
+
 def isstaticmethod(obj: Any) -> bool:
-    # https://stackoverflow.com/questions/3589311/
-    # get-defining-class-of-unbound-method-object-in-python-3/
-    # Modified from Yoel's Answer
-    obj = unwrap_all(obj)
+    return introspect(obj).is_static
+
+
+def _mangle(cls: type, name: str) -> str:
+    """Private name mangling, e.g. ``_Class__name`` for ``__name``."""
+    if name.startswith('__') and not name.endswith('__') and (
+            cls.__name__.lstrip('_')):
+        return '_{}{}'.format(cls.__name__.lstrip('_'), name)
+    return name
+
+
+def owner_class(obj: Any) -> Optional[type]:
+    """The class defining function ``obj`` from its qualified name.
+
+    Nested classes are supported, but not classes in local scopes.
+    """
+    module = sys.modules.get(getattr(obj, '__module__', None) or '')
+    if module is None:
+        module = inspect.getmodule(obj)
+    owner = module
+    path = obj.__qualname__.split('.<locals>', 1)[0].split('.')[:-1]
+    for part in path:
+        owner = getattr(owner, part, None)
+    if path and isinstance(owner, type):
+        return owner
+    owner = getattr(obj, '__objclass__', None)
+    return owner if isinstance(owner, type) else None
+
+
+# Member kinds of classes, see ``member_kinds``
+_member_kinds = weakref.WeakKeyDictionary()
+
+
+def member_kinds(cls: type) -> Dict[str, str]:
+    """Descriptor kinds of all members of ``cls``, computed once per class.
+
+    Maps member names (mangled if private) to ``'static'``, ``'class'``
+    or ``'instance'``, following the MRO as :func:`inspect.getattr_static`.
+    """
+    try:
+        return _member_kinds[cls]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable or not weakly referenceable
+        return _build_member_kinds(cls)
+    kinds = _build_member_kinds(cls)
+    try:
+        _member_kinds[cls] = kinds
+    except TypeError:
+        pass
+    return kinds
+
+
+def _build_member_kinds(cls: type) -> Dict[str, str]:
+    kinds = {}
+    for klass in reversed(inspect.getmro(cls)):
+        for name, value in vars(klass).items():
+            if isinstance(value, staticmethod):
+                kinds[name] = 'static'
+            elif isinstance(value, classmethod):
+                kinds[name] = 'class'
+            else:
+                kinds[name] = 'instance'
+    return kinds
+
+
+def _isstaticmethod(obj: Any) -> bool:
     if not inspect.isfunction(obj):
         return False
-    cls = getattr(inspect.getmodule(obj),
-                  obj.__qualname__.split('.<locals>', 1)[0].rsplit('.', 1)[0],
-                  None)
-    cls = cls if isinstance(cls, type) else getattr(obj, '__objclass__', None)
+    cls = owner_class(obj)
+    return cls is not None and member_kinds(cls).get(
+        _mangle(cls, obj.__name__)) == 'static'
+
+
+# Config values the output of ``process_docstring`` depends on
+output_config_values = (
+    'always_document_default_args',
+    'docstring_default_arg_flags',
+    'docstring_default_arg_flags_multiline_matching',
+    'docstring_default_arg_strip_matching',
+    'docstring_default_arg_after_directives',
+    'docstring_default_arg_substitution',
+    'docstring_default_arg_max_length',
+    'docstring_default_arg_source_defaults',
+)
+
+
+# Each distinct output config once, as keys of many cache entries
+_output_configs = {}  # type: Dict[tuple, tuple]
+
+
+def output_config(config: Any) -> tuple:
+    """Hashable values of ``output_config_values``."""
+    values = tuple(
+        tuple(map(tuple, value)) if isinstance(value, list) else value
+        for value in (getattr(config, name) for name in output_config_values))
+    return _output_configs.setdefault(values, values)
+
+
+# Config values a ``CompiledConfig`` is compiled from
+compiled_config_values = output_config_values + (
+    'docstring_default_arg_max_lines',
+    'docstring_default_arg_max_params',
+    'docstring_default_arg_time_limit',
+)
 
-    # https://stackoverflow.com/questions/8727059/
-    # python-check-if-method-is-static
-    # Modified from Azmisov's Answer
-    return isinstance(
-        inspect.getattr_static(cls, mangle(cls, obj.__name__), None),
-        staticmethod)
+# What processing a docstring needs of the config, see ``compile_config``.
+# ``values`` are those set on the config it was compiled from,
+# ``default_prefix`` and ``stub_suffix`` join the substitution
+# to a default value and to the head of an added field.
+CompiledConfig = collections.namedtuple('CompiledConfig', [
+    'values', 'output_config', 'always_document', 'matcher', 'strip',
+    'include_blank', 'substitution', 'default_prefix', 'stub_suffix',
+    'max_lines', 'max_params', 'time_limit'])
 
 
-def process_docstring(app: Sphinx, what: str, name: str, obj: Any,
+def _set_values(config: Any) -> tuple:
+    return tuple(map(vars(config).get, compiled_config_values))
+
+
+def compile_config(config: Any) -> CompiledConfig:
+    """Read the config values of :func:`process_lines` at once.
+
+    Reading a value of a Sphinx config not set in ``conf.py`` goes
+    through ``Config.__getattr__``, which costs more than reusing
+    a processed docstring, so this is only done here.
+    """
+    strip = config.docstring_default_arg_strip_matching
+    substitution = config.docstring_default_arg_substitution
+    return CompiledConfig(
+        values=_set_values(config),
+        output_config=output_config(config),
+        always_document=config.always_document_default_args,
+        matcher=flag_matcher(
+            tuple(map(tuple, config.docstring_default_arg_flags)), strip,
+            config.docstring_default_arg_flags_multiline_matching),
+        strip=strip,
+        include_blank=config.docstring_default_arg_after_directives,
+        substitution=substitution,
+        default_prefix=' {} '.format(substitution),
+        stub_suffix=': {} '.format(substitution),
+        max_lines=config.docstring_default_arg_max_lines,
+        max_params=config.docstring_default_arg_max_params,
+        time_limit=config.docstring_default_arg_time_limit)
+
+
+# The config compiled last, at config-inited unless a value changed since
+_compiled = None  # type: Optional[CompiledConfig]
+
+
+def compiled_config(config: Any) -> CompiledConfig:
+    """The :class:`CompiledConfig` of ``config``.
+
+    Compiled again only if the values set on ``config`` differ from
+    those compiled last, e.g. if changed after config-inited,
+    which is checked without reading any value through the config.
+    """
+    global _compiled
+    compiled = _compiled
+    if compiled is None or compiled.values != _set_values(config):
+        compiled = _compiled = compile_config(config)
+    return compiled
+
+
+# Kinds of objects documented without their first argument
+bound_kinds = ('method', 'property', 'class')
+
+
+@functools.lru_cache(maxsize=None)
+def code_digest() -> str:
+    """Digest of this module, so that results of other versions
+    of the extension are not reused."""
+    import hashlib
+
+    try:
+        with open(__file__, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return ''
+
+
+class ResultCache(object):
+    """Processed docstrings by digest of everything they depend on.
+
+    Holds up to ``maxsize`` entries, evicting the least recently used,
+    and can be saved to and loaded from a JSON file between builds.
+    Unless ``used`` is None, the entries got or put are also collected
+    there, to be recorded for the document being read.
+    ``last_key`` is the key of the entry got or put last.
+    Keys and files depend on :func:`code_digest`.
+    """
+
+    version = 1
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self.enabled = False
+        self.hits = 0
+        self.misses = 0
+        self.modified = False
+        self.used = None  # type: Optional[Dict[str, List[str]]]
+        self.last_key = None  # type: Optional[str]
+        self._entries = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def encode(lines: List[str]) -> str:
+        """``lines`` as a single string, for :meth:`update`."""
+        return ''.join(line + '\n' for line in lines)
+
+    @staticmethod
+    def decode(text: str) -> List[str]:
+        return text.split('\n')[:-1]
+
+    @staticmethod
+    def key(compiled: CompiledConfig, what: str, lines: List[str],
+            info: Introspection, first_argname: Optional[str]) -> str:
+        import hashlib
+
+        data = json.dumps([
+            code_digest(), compiled.output_config,
+            what, lines, info.args, first_argname,
+            [[argname, is_keyword_only, render_default(default)]
+             for argname, (default, is_keyword_only)
+             in info.default_args.items()],
+        ], default=repr)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        lines = self._entries.get(key)
+        if lines is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            self.last_key = key
+            if self.used is not None:
+                self.used[key] = lines
+        return lines
+
+    def put(self, key: str, lines: List[str]) -> None:
+        self._entries[key] = lines = list(lines)
+        self._entries.move_to_end(key)
+        while len(self._entries) > max(self.maxsize, 0):
+            self._entries.popitem(last=False)
+        self.modified = True
+        self.last_key = key
+        if self.used is not None:
+            self.used[key] = lines
+
+    def use(self, key: str, lines: Sequence[str]) -> None:
+        """Collect ``lines`` in ``used`` under ``key`` like :meth:`get`,
+        e.g. if reused without getting them."""
+        if self.used is not None:
+            self.used[key] = list(lines)
+
+    def update(self, entries: Dict[str, str]) -> None:
+        """Add the ``entries`` (see :meth:`encode`) not cached yet,
+        as the least recently used."""
+        for key, text in entries.items():
+            if key not in self._entries:
+                self._entries[key] = self.decode(text)
+                self._entries.move_to_end(key, last=False)
+                self.modified = True
+        while len(self._entries) > max(self.maxsize, 0):
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+        self.modified = False
+        self.last_key = None
+        if self.used is not None:
+            self.used.clear()
+
+    def load(self, path: str) -> None:
+        """Replace the entries by those saved in ``path`` if valid."""
+        self.clear()
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f, object_pairs_hook=collections.OrderedDict)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != (
+                self.version) or data.get('code') != code_digest():
+            return
+        for key, lines in data.get('entries', {}).items():
+            self._entries[key] = lines
+        while len(self._entries) > max(self.maxsize, 0):
+            self._entries.popitem(last=False)
+
+    def save(self, path: str) -> None:
+        """Write the entries to ``path`` in least recently used order."""
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(version=self.version, code=code_digest(),
+                           entries=self._entries), f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        self.modified = False
+
+
+result_cache = ResultCache()
+
+
+def _describe_default(argname: str, default: Any) -> str:
+    return format_default(default)
+
+
+# Stands for the rendered default of an argument in a cached plan
+_placeholder = re.compile('\x00([^\x00]*)\x00')
+
+
+def _placeholder_text(argname: str, default: Any) -> str:
+    return '\x00{}\x00'.format(argname)
+
+
+class PlanCache(object):
+    """Edit plans of docstrings by their field layout.
+
+    Docstrings generated from a template have the same fields
+    and differ in their default values only.
+    Their plan of edits (see :meth:`EditBuffer.plan`) is cached
+    with placeholders for the rendered defaults, so that it applies
+    without searching any field to all docstrings of the same layout.
+    Holds up to ``maxsize`` plans, evicting the least recently used.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(compiled: CompiledConfig, lines: List[str],
+            info: Introspection, first_argname: Optional[str]
+            ) -> Optional[tuple]:
+        """Everything the plan for ``lines`` depends on.
+
+        Lines of the fields of default arguments are kept verbatim,
+        the others as far as :class:`FieldIndex` depends on them.
+        None if ``lines`` contain a placeholder.
+        """
+        default_args = info.default_args
+        layout = []
+        verbatim = False
+        for line in lines:
+            if '\x00' in line:
+                return None
+            kind = _line_kind(line)
+            if kind == _TOPLEVEL:
+                verbatim = False
+                if line.startswith(':'):
+                    match = _field_head.match(line)
+                    verbatim = match is not None and (
+                        match.group(2) in default_args)
+                    if not verbatim:
+                        layout.append((match and match.group(0),
+                                       line.startswith(other_field_prefixes)))
+                        continue
+            layout.append(line if verbatim else kind)
+        return (tuple(layout), tuple(info.args), first_argname,
+                tuple((argname, is_keyword_only) for argname, (
+                    default, is_keyword_only) in default_args.items()),
+                compiled.output_config)
+
+    def get(self, key: tuple) -> Optional[List[Tuple[str, int, Any]]]:
+        plan = self._entries.get(key)
+        if plan is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return plan
+
+    def put(self, key: tuple, plan: List[Tuple[str, int, Any]]) -> None:
+        self._entries[key] = plan
+        self._entries.move_to_end(key)
+        while len(self._entries) > max(self.maxsize, 0):
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def apply(plan: List[Tuple[str, int, Any]], lines: List[str],
+              default_args: Dict[str, Tuple[Any, bool]]) -> None:
+        """Write ``plan`` to ``lines``, filling in ``default_args``."""
+        def fill(line: str) -> str:
+            if '\x00' not in line:
+                return line
+            return _placeholder.sub(
+                lambda match: format_default(default_args[match.group(1)][0]),
+                line)
+
+        if not plan:
+            return
+        result = []  # type: List[str]
+        pos = 0
+        for op, idx, arg in plan:
+            result.extend(lines[pos:idx])
+            if op == 'delete':
+                pos = arg
+            elif op == 'replace':
+                result.append(fill(arg))
+                pos = idx + 1
+            else:
+                result.extend(map(fill, arg))
+                pos = idx
+        result.extend(lines[pos:])
+        lines[:] = result
+
+
+plan_cache = PlanCache()
+
+
+class _ProfileStats(object):
+    """Adapts a profile ``stats`` dict to :class:`pstats.Stats`."""
+
+    def __init__(self, stats: Dict[tuple, tuple]) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class Instrumentation(object):
+    """Opt-in timings and operation counts of :func:`process_docstring`.
+
+    Each call is recorded with its wall time and the counts of the
+    operations in ``counted`` under the document being read,
+    in the build environment, so that records of parallel readers
+    are merged like other environment data.
+    Optionally, the calls are profiled with :mod:`cProfile`.
+    """
+
+    counted = ('match_field', 'find_arg', 'Signature', 'object_description')
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.profiler = None  # type: Optional[cProfile.Profile]
+        self.counts = collections.Counter()
+        self._start = None  # type: Optional[float]
+
+    def count(self, operation: str) -> None:
+        if self.enabled:
+            self.counts[operation] += 1
+
+    def start(self) -> None:
+        self.counts = collections.Counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        self._start = time.perf_counter()
+
+    def stop(self, env: Any, what: str, name: str) -> None:
+        elapsed = time.perf_counter() - self._start
+        if self.profiler is not None:
+            self.profiler.disable()
+        records = getattr(env, 'defaultargs_records', None)
+        if records is not None:
+            records.setdefault(env.docname, []).append(
+                (name, what, elapsed, dict(self.counts)))
+
+    def snapshot_profile(self, env: Any) -> None:
+        """Move the profile of the current document to ``env``."""
+        profiles = getattr(env, 'defaultargs_profiles', None)
+        if self.profiler is None or profiles is None:
+            return
+        self.profiler.snapshot_stats()
+        if self.profiler.stats:
+            profiles[env.docname] = self.profiler.stats
+        self.profiler.clear()
+
+    @staticmethod
+    def report(records: Dict[str, List[tuple]], top: int) -> Dict[str, Any]:
+        """Summary of ``records`` with the ``top`` slowest objects."""
+        counters = collections.Counter()
+        objects = []
+        for docname, doc_records in sorted(records.items()):
+            for name, what, elapsed, counts in doc_records:
+                counters.update(counts)
+                objects.append(dict(name=name, what=what, docname=docname,
+                                    seconds=elapsed, counts=counts))
+        objects.sort(key=lambda record: record['seconds'], reverse=True)
+        return dict(
+            objects=len(objects),
+            seconds=sum(record['seconds'] for record in objects),
+            counters=dict(sorted(counters.items())),
+            documents={docname: sum(record[2] for record in doc_records)
+                       for docname, doc_records in sorted(records.items())},
+            slowest=objects[:max(top, 0)])
+
+    @staticmethod
+    def merge_profiles(profiles: Iterable[Dict[tuple, tuple]]
+                       ) -> Optional['pstats.Stats']:
+        import pstats
+
+        stats = None
+        for profile in profiles:
+            if stats is None:
+                stats = pstats.Stats(_ProfileStats(profile))
+            else:
+                stats.add(_ProfileStats(profile))
+        return stats
+
+
+instrument = Instrumentation()
+
+
+def process_docstring(app: 'Sphinx', what: str, name: str, obj: Any,
                       options: Any, lines: List[str]) -> None:
     """Process docstring after Sphinx.
 
     See `autodoc-process-docstring <https://www.sphinx-doc.org/en/master/
     usage/extensions/autodoc.html#event-autodoc-process-docstring>`_
     """
+    if not instrument.enabled:
+        return _process_docstring(app, what, name, obj, options, lines)
+    instrument.start()
+    try:
+        _process_docstring(app, what, name, obj, options, lines)
+    finally:
+        instrument.stop(getattr(app, 'env', None), what, name)
+
 
+def documented_callable(obj: Any) -> Optional[Callable]:
+    """The callable whose arguments are documented for ``obj``, if any."""
     # original_obj = obj
     if isinstance(obj, property):
         obj = obj.fget
 
     if not callable(obj):
-        return
+        return None
 
     if inspect.isclass(obj):
         obj = getattr(obj, '__init__', getattr(obj, '__new__', None))
         # obj = getattr(obj, '__init__')
 
-    obj = inspect.unwrap(obj)
+    return inspect.unwrap(obj)
+
 
-    rm_first_arg = what in ['method', 'property',
-                            'class'] and not isstaticmethod(obj)
-    first_argname = next(iter(Signature(unwrap_all(
-        obj)).parameters)) if rm_first_arg else None
-    if first_argname and first_argname.endswith('_'):
-        first_argname = '{}\\_'.format(first_argname[:-1])
+def _process_docstring(app: 'Sphinx', what: str, name: str, obj: Any,
+                       options: Any, lines: List[str]) -> None:
+    func = documented_callable(obj)
+    record_index(app, what, name, obj, func)
+    obj = func
+    if obj is None or obj in no_signature:
+        return
+    info = introspect(obj)
+    try:
+        if not info.default_args:
+            return
+    except (TypeError, ValueError):
+        # No signature, see NoSignatureCache
+        return
+
+    # The same callable is documented again, e.g. if inherited
+    key = (what in bound_kinds, lines_digest(lines),
+           compiled_config(app.config).output_config,
+           render_default.generation)
+    cached = info.result(key)
+    if cached is not None:
+        lines[:], cache_key, exceeded = cached
+        if cache_key is not None:
+            # Still used by the document being read
+            result_cache.use(cache_key, lines)
+        if exceeded is not None:
+            report_budget(app, what, name, *exceeded)
+        return
+    result_cache.last_key = None
+    exceeded = process_lines_within_budgets(app, what, name, lines, info)
+    info.remember(key, lines, result_cache.last_key, exceeded)
+    info.compact()
+
+
+def lines_digest(lines: List[str]) -> bytes:
+    """Digest of ``lines``, not to keep them alive in a key."""
+    import hashlib
+
+    return hashlib.sha1('\n'.join(lines).encode(
+        'utf-8', 'surrogatepass')).digest()
+
+
+def field_list_span(lines: List[str]) -> Tuple[int, int]:
+    """``(start, stop)`` of the lines from the first field
+    to the end of the last one, empty at the end if there is no field."""
+    start = next((i for i, line in enumerate(lines)
+                  if line.startswith(':')), len(lines))
+    last = next((i for i in range(len(lines) - 1, start, -1)
+                 if lines[i].startswith(':')), start)
+    stop = min(last + 1, len(lines))
+    while stop < len(lines) and _line_kind(lines[stop]) != _TOPLEVEL:
+        stop += 1
+    return start, stop
+
+
+def process_lines_within_budgets(app: 'Sphinx', what: str, name: str,
+                                 lines: List[str], info: Introspection
+                                 ) -> Optional[Tuple[str, bool]]:
+    """:func:`process_lines`, falling back if a budget is exceeded.
+
+    Docstrings of too many lines are processed in their field list only
+    (see :func:`field_list_span`), others are left as they are
+    with a warning. Both are reported by :func:`report_budget`.
+
+    Returns:
+        The arguments of :func:`report_budget` if a budget is exceeded.
+    """
+    try:
+        process_lines(app, what, lines, info)
+        return None
+    except BudgetExceeded as error:
+        exceeded = error
+    if exceeded.budget == 'docstring_default_arg_max_lines':
+        start, stop = field_list_span(lines)
+        field_list = lines[start:stop]
+        try:
+            process_lines(app, what, field_list, info)
+        except BudgetExceeded as error:
+            exceeded = error
+        else:
+            lines[start:stop] = field_list
+            report_budget(app, what, name, str(exceeded), False)
+            return str(exceeded), False
+    report_budget(app, what, name, str(exceeded), True)
+    return str(exceeded), True
+
+
+def report_budget(app: 'Sphinx', what: str, name: str, exceeded: str,
+                  unprocessed: bool) -> None:
+    """Warn of a docstring left ``unprocessed``, and record ``exceeded``
+    for :func:`report_budgets`."""
+    if unprocessed:
+        logger.warning('sphinx_autodoc_defaultargs: default arguments of %s '
+                       'not documented, %s', name, exceeded)
+        record_budget(app, what, name, exceeded)
+    else:
+        record_budget(app, what, name,
+                      '{}, only the field list processed'.format(exceeded))
+
+
+def record_budget(app: 'Sphinx', what: str, name: str, message: str) -> None:
+    env = getattr(app, 'env', None)
+    records = getattr(env, 'defaultargs_budgets', None)
+    if records is not None:
+        records.setdefault(env.docname, []).append((name, what, message))
 
-    default_args = get_default_args(obj)
+
+class BudgetExceeded(Exception):
+    """A docstring exceeds a budget of :func:`process_lines`.
+
+    ``budget`` is the name of the config value.
+    """
+
+    def __init__(self, budget: str, limit: Any, found: str) -> None:
+        super().__init__('{} exceeding {} = {}'.format(found, budget, limit))
+        self.budget = budget
+
+
+def process_lines(app: 'Sphinx', what: str, lines: List[str],
+                  info: Introspection) -> None:
+    """Document the default arguments of ``info`` in ``lines``.
+
+    ``info`` can be any object with the ``args``, ``default_args``
+    and ``is_static`` of :class:`Introspection`.
+
+    Raises:
+        BudgetExceeded: Before any change to ``lines``.
+    """
+    default_args = info.default_args
+    if not default_args:
+        return
+
+    compiled = compiled_config(app.config)
+    max_params = compiled.max_params
+    if max_params is not None and len(default_args) > max_params:
+        raise BudgetExceeded(
+            'docstring_default_arg_max_params', max_params,
+            '{} default arguments'.format(len(default_args)))
+    max_lines = compiled.max_lines
+    if max_lines is not None and len(lines) > max_lines:
+        raise BudgetExceeded('docstring_default_arg_max_lines', max_lines,
+                             '{} lines'.format(len(lines)))
+    time_limit = compiled.time_limit
+    deadline = None if time_limit is None else (
+        time.perf_counter() + time_limit)
+
+    rm_first_arg = what in bound_kinds and not info.is_static
+    first_argname = info.args[0].lstrip(
+        r'\*') if rm_first_arg and info.args else None
+
+    cache_key = None
+    if result_cache.enabled:
+        cache_key = result_cache.key(
+            compiled, what, lines, info, first_argname)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            lines[:] = cached
+            return
+
+    plan_key = None
+    if plan_cache.maxsize > 0:
+        plan_key = plan_cache.key(compiled, lines, info, first_argname)
+    if plan_key is None:
+        edit_lines(compiled, lines, info, rm_first_arg, first_argname,
+                   _describe_default, deadline).apply()
+    else:
+        plan = plan_cache.get(plan_key)
+        if plan is None:
+            plan = edit_lines(compiled, lines, info, rm_first_arg,
+                              first_argname, _placeholder_text,
+                              deadline).plan()
+            plan_cache.put(plan_key, plan)
+        plan_cache.apply(plan, lines, default_args)
+
+    if cache_key is not None:
+        result_cache.put(cache_key, lines)
+
+
+def edit_lines(compiled: CompiledConfig, lines: List[str],
+               info: Introspection, rm_first_arg: bool,
+               first_argname: Optional[str],
+               describe: Callable[[str, Any], str],
+               deadline: Optional[float] = None) -> EditBuffer:
+    """The edits of :func:`process_lines`, not applied yet.
+
+    ``describe(argname, default)`` renders the default of an argument.
+
+    Raises:
+        BudgetExceeded: If :func:`time.perf_counter` passes ``deadline``.
+    """
+    default_args = info.default_args
+    buffer = EditBuffer(lines)
+    index = FieldIndex(buffer)
+    matcher = compiled.matcher
+    include_blank = compiled.include_blank
+    strip = compiled.strip
+    always_document = compiled.always_document
     for argname, (default, is_keyword_only) in default_args.items():
+        if deadline is not None and time.perf_counter() > deadline:
+            raise BudgetExceeded(
+                'docstring_default_arg_time_limit', compiled.time_limit,
+                'processing time')
 
-        # what if default has \
-        default = ':code:`{}`'.format(object_description(default))
+        # The documented default if found,
+        # otherwise ``default`` is rendered only when inserted.
+        default_text = None
 
         # TODO
         # should be arguments
-        strip = app.config.docstring_default_arg_strip_matching
         docstring_default_arg_parenthesis = False
 
         # Search for parameters
         # TODO Test case: empty param
-        searchfor = [':{} {}:'.format(field, argname)
-                     for field in param_fields]
-        param_found, param_start, param_end, param_matched, param_text = (
-            match_field(lines, searchfor, include_blank=app.config.
-                        docstring_default_arg_after_directives))
+        param = index.find(param_fields, argname)
+        param_found = param is not None
 
         if param_found:
+            param_start = index.start(param)
+            param_end = index.end(param, include_blank)
+            param_matched = param.matched
+            param_text = index.span(param, include_blank)
 
-            if app.config.docstring_default_arg_substitution not in ' '.join(
-                    param_text):
+            if not param_text.contains(compiled.substitution):
 
                 # Extracts all the flags
-                for head, tail in app.config.docstring_default_arg_flags:
-                    tail_found, is_end, t_start = rfind_substring_in_paragraph(
-                        param_text, tail, strip,
-                        app.config.
-                        docstring_default_arg_flags_multiline_matching)[:3]
-                    if tail_found and is_end:
-                        head_found, _, h_start, h_end = (
-                            rfind_substring_in_paragraph(
-                                param_text, head, strip,
-                                app.config.
-                                docstring_default_arg_flags_multiline_matching)
-                        )
-                        if head_found:
-                            # what if default has \
-                            if h_end[0] == t_start[0]:
-                                default = param_text[h_end[0]
-                                                     ][h_end[1]:t_start[1]]
-                            else:
-                                default = ' '.join(
-                                    [param_text[h_end[0]][h_end[1]:]] +
-                                    param_text[h_end[0] + 1:t_start[0]] +
-                                    [param_text[t_start[0]][:t_start[1]]])
-                            if strip:
-                                default = default.strip()
-                            lines[param_start + h_start[0]] = (
-                                lines[param_start + h_start[0]
-                                      ][:len(param_matched) + 1 + h_start[1]])
-                            del lines[param_start +
-                                      h_start[0] + 1: param_end]
-                            param_end = param_start + h_start[0] + 1
-                            break
+                flags = matcher(param_text)
+                if flags is not None:
+                    h_start, h_end, t_start = flags
+                    default_text = flag_text(param_text, h_end, t_start,
+                                             strip)
+                    index.replace(
+                        param_start + h_start[0],
+                        buffer[param_start + h_start[0]
+                               ][:len(param_matched) + 1 + h_start[1]])
+                    index.delete(param_start + h_start[0] + 1, param_end)
+                    param_end = param_start + h_start[0] + 1
 
                 if strip:
-                    lines[param_end - 1] = rstrip_min(
-                        lines[param_end - 1], len(param_matched) + 1)
+                    index.replace(param_end - 1, rstrip_min(
+                        buffer[param_end - 1], len(param_matched) + 1))
 
                 if docstring_default_arg_parenthesis:
                     raise NotImplementedError
                 else:
                     # To prevent insertion into Note directives or so
-                    lines.insert(
+                    index.insert(
                         param_end,
-                        ' ' * len(param_matched) + ' {} {}'.format(
-                            app.config.docstring_default_arg_substitution,
-                            default))
-        elif app.config.always_document_default_args and (
+                        ' ' * len(param_matched) + compiled.default_prefix + (
+                            describe(argname, default)
+                            if default_text is None else default_text))
+        elif always_document and (
                 not rm_first_arg or argname != first_argname):
 
             # Since ``kwargs`` (no default args) might come
             # after ``argname``, it will not be in ``default_args``.
             # Need to generate the full args list.
-            next_start, next_type = find_next_arg(
-                lines, get_args(obj), argname)
+            next_start, next_type = index.find_arg(
+                info.args, argname, incr=1)
 
             if docstring_default_arg_parenthesis:
                 raise NotImplementedError
             else:
-                lines.insert(
-                    next_start, ':{} {}: {} {}'.format(
-                        'keyword' if is_keyword_only and (
-                            next_type is None or
-                            next_type in kw_fields) else 'param',
-                        argname,
-                        app.config.docstring_default_arg_substitution,
-                        default))
+                index.insert(
+                    next_start, (':keyword ' if is_keyword_only and (
+                        next_type is None or next_type in kw_fields)
+                        else ':param ') + argname + compiled.stub_suffix +
+                    describe(argname, default))
 
         # Search for type
-        type_found, type_start, type_end, type_matched, type_text = (
-            match_field(lines, [':{} {}:'.format(field, argname)
-                                for field in type_fields], include_blank=False)
-        )
+        type_field = index.find(type_fields, argname)
 
-        if type_found:
-            type_text = ' '.join(type_text)
+        if type_field is not None:
+            type_start = index.start(type_field)
+            type_end = index.end(type_field)
+            type_matched = type_field.matched
+            type_text = ' '.join(index.text(type_field))
             if strip:
                 type_text = type_text.rstrip()
-                lines[type_end - 1] = rstrip_min(lines[type_end - 1],
-                                                 len(type_matched) + 1)
+                index.replace(type_end - 1, rstrip_min(
+                    buffer[type_end - 1], len(type_matched) + 1))
             if not type_text.endswith('optional'):
                 if not type_text.strip():
-                    lines[type_start] = '{} optional'.format(type_matched)
+                    index.replace(type_start, type_matched + ' optional')
                 elif '`' in type_text:
                     # TODO check \` escape
-                    lines[type_end - 1] += ', *optional*'
+                    index.replace(type_end - 1,
+                                  buffer[type_end - 1] + ', *optional*')
                 else:
                     # Do not insert newline to prevent whitespace before ','
-                    lines[type_end - 1] += ', optional'
-        elif param_found or app.config.always_document_default_args and (
+                    index.replace(type_end - 1,
+                                  buffer[type_end - 1] + ', optional')
+        elif param_found or always_document and (
                 not rm_first_arg or argname != first_argname):
             # insert type before param
-            param_start, param_type = find_curr_arg(
-                lines, get_args(obj), argname)
-            assert any(lines[param_start].startswith(search)
-                       for search in searchfor)
-            lines.insert(
-                param_start, ':{}type {}: optional'.format(
-                    'kw' if param_type in kw_fields else '', argname))
+            param_start, param_type = index.find_arg(
+                info.args, argname, incr=0)
+            assert index.start(
+                index.find(param_fields, argname)) == param_start
+            index.insert(
+                param_start, (':kwtype ' if param_type in kw_fields
+                              else ':type ') + argname + ': optional')
+    return buffer
+
+
+def optional_type(type_text: str) -> str:
+    """``type_text`` of a field marked as optional."""
+    if type_text.endswith('optional'):
+        return type_text
+    if not type_text.strip():
+        return 'optional'
+    # TODO check \` escape
+    return type_text + (', *optional*' if '`' in type_text else ', optional')
+
+
+class FieldDefaults(object):
+    """Documents default arguments in the fields of the parameter
+    sections parsed by napoleon, before they are rendered.
+
+    ``documented`` holds the names of the arguments documented so far.
+    """
 
+    def __init__(self, config: Any, info: Any) -> None:
+        self.compiled = compiled_config(config)
+        # Names as documented, possibly escaped by napoleon
+        self.default_args = {
+            argname.replace('\\', ''): (argname, default)
+            for argname, (default, _) in info.default_args.items()}
+        self.documented = set()  # type: set
+
+    def field(self, name: str, type_text: str, desc: List[str],
+              last: bool = False) -> Tuple[str, str, List[str]]:
+        """The field of an argument with its default documented.
+
+        ``last`` is whether it is the last field of its section.
+        """
+        compiled = self.compiled
+        argname, default = self.default_args[name.replace('\\', '')]
+        self.documented.add(argname)
+        if Span(desc, 0, len(desc), 0).contains(compiled.substitution):
+            return name, optional_type(type_text), desc
+
+        # Like the field in the text, from the first nonblank line
+        # up to the next blank line unless
+        # ``docstring_default_arg_after_directives``
+        end = len(desc)
+        while end and not desc[end - 1].strip():
+            end -= 1
+        start = next((i for i, line in enumerate(desc[:end])
+                      if line.strip()), end)
+        if not compiled.include_blank:
+            end = next((i for i, line in enumerate(desc[start:end], start)
+                        if not line.strip()), end)
+        head, text, rest = desc[:start], desc[start:end], desc[end:]
+
+        strip = compiled.strip
+        default_text = None
+        flags = compiled.matcher(text)
+        if flags is not None:
+            h_start, h_end, t_start = flags
+            default_text = flag_text(text, h_end, t_start, strip)
+            text[h_start[0]:] = [text[h_start[0]][:h_start[1]]]
+        elif compiled.include_blank and last and not type_text:
+            # In the text, followed by the blank line after the section
+            # instead of a type field, so the default is a paragraph
+            text.append('')
+        if strip and text:
+            text[-1] = text[-1].rstrip()
+        text.append(compiled.substitution + ' ' + (
+            format_default(default) if default_text is None
+            else default_text))
+        return name, optional_type(type_text), head + text + rest
+
+    def fields(self, fields: List[Tuple[str, str, List[str]]]
+               ) -> List[Tuple[str, str, List[str]]]:
+        last = len(fields) - 1
+        return [self.field(*field, last=i == last)
+                if field[0].replace('\\', '') in self.default_args else field
+                for i, field in enumerate(fields)]
+
+
+class NapoleonDefaultsMixin(object):
+    """Mixin of napoleon's docstring classes documenting default
+    arguments by a :class:`FieldDefaults` in parameter sections."""
+
+    def __init__(self, *args: Any, defaults: Optional[FieldDefaults] = None,
+                 **kwargs: Any) -> None:
+        # Set before the docstring is parsed when initialized
+        self._defaults = defaults
+        self._parameter_section = False
+        super().__init__(*args, **kwargs)
+
+    def _consume_fields(self, *args: Any, **kwargs: Any
+                        ) -> List[Tuple[str, str, List[str]]]:
+        fields = super()._consume_fields(*args, **kwargs)
+        if self._parameter_section and self._defaults is not None:
+            fields = self._defaults.fields(fields)
+        return fields
+
+    def _parse_parameter_section(self, parse: Callable[[str], List[str]],
+                                 section: str) -> List[str]:
+        self._parameter_section = True
+        try:
+            return parse(section)
+        finally:
+            self._parameter_section = False
+
+    def _parse_parameters_section(self, section: str) -> List[str]:
+        return self._parse_parameter_section(
+            super()._parse_parameters_section, section)
+
+    def _parse_keyword_arguments_section(self, section: str) -> List[str]:
+        return self._parse_parameter_section(
+            super()._parse_keyword_arguments_section, section)
+
+    def _parse_other_parameters_section(self, section: str) -> List[str]:
+        return self._parse_parameter_section(
+            super()._parse_other_parameters_section, section)
+
+
+@functools.lru_cache(maxsize=None)
+def napoleon_docstrings() -> Tuple[type, type]:
+    """Napoleon's ``NumpyDocstring`` and ``GoogleDocstring``
+    with :class:`NapoleonDefaultsMixin`."""
+    from sphinx.ext.napoleon.docstring import GoogleDocstring, NumpyDocstring
+    return (type('NumpyDocstring', (NapoleonDefaultsMixin, NumpyDocstring),
+                 {}),
+            type('GoogleDocstring', (NapoleonDefaultsMixin, GoogleDocstring),
+                 {}))
+
+
+def process_napoleon_docstring(app: 'Sphinx', what: str, name: str,
+                               obj: Any, options: Any,
+                               lines: List[str]) -> None:
+    """Convert the docstring like ``sphinx.ext.napoleon``, documenting
+    default arguments in its parameter sections directly.
+
+    Default arguments not documented there are then processed
+    like by :func:`process_docstring`, e.g. in reST fields.
+    """
+    if not instrument.enabled:
+        return _process_napoleon_docstring(app, what, name, obj, options,
+                                           lines)
+    instrument.start()
+    try:
+        _process_napoleon_docstring(app, what, name, obj, options, lines)
+    finally:
+        instrument.stop(getattr(app, 'env', None), what, name)
+
+
+def _process_napoleon_docstring(app: 'Sphinx', what: str, name: str,
+                                obj: Any, options: Any,
+                                lines: List[str]) -> None:
+    config = app.config
+    func = documented_callable(obj)
+    record_index(app, what, name, obj, func)
+    info = None
+    if func is not None and func not in no_signature:
+        info = introspect(func)
+        try:
+            info.default_args
+        except (TypeError, ValueError):
+            # No signature, see NoSignatureCache
+            info = None
+    defaults = FieldDefaults(config, info) if info is not None and (
+        info.default_args) else None
+
+    numpy_docstring, google_docstring = napoleon_docstrings()
+    result = lines
+    if config.napoleon_numpy_docstring:
+        result = numpy_docstring(result, config, app, what, name, obj,
+                                 options, defaults=defaults).lines()
+    if config.napoleon_google_docstring:
+        result = google_docstring(result, config, app, what, name, obj,
+                                  options, defaults=defaults).lines()
+    lines[:] = result
+    if defaults is not None and len(defaults.documented) < len(
+            defaults.default_args):
+        # Only the arguments not documented yet
+        undocumented = types.SimpleNamespace(
+            args=info.args, is_static=info.is_static,
+            default_args=OrderedDict(
+                (argname, default) for argname, default
+                in info.default_args.items()
+                if argname not in defaults.documented))
+        process_lines_within_budgets(app, what, name, lines, undocumented)
+
+
+def init_napoleon(app: 'Sphinx', config: Any) -> None:
+    """Replace the docstring processing of ``sphinx.ext.napoleon``
+    and of this extension by :func:`process_napoleon_docstring`
+    if ``docstring_default_arg_napoleon`` is set."""
+    if not config.docstring_default_arg_napoleon:
+        return
+    from sphinx.ext import napoleon
+
+    listeners = app.events.listeners.get('autodoc-process-docstring', [])
+    replaced = [listener for listener in listeners
+                if listener.handler is napoleon._process_docstring]
+    if not replaced:
+        logger.warning('sphinx_autodoc_defaultargs: '
+                       'docstring_default_arg_napoleon is set, '
+                       'but sphinx.ext.napoleon is not loaded')
+        return
+    for listener in list(listeners):
+        if listener.handler in (napoleon._process_docstring,
+                                process_docstring):
+            app.disconnect(listener.id)
+    app.connect('autodoc-process-docstring', process_napoleon_docstring,
+                priority=replaced[0].priority)
+
+
+def init_caches(app: 'Sphinx', config: Any) -> None:
+    global _compiled
+    _compiled = compile_config(config)
+    introspect.maxsize = config.docstring_default_arg_cache_size
+    render_default.max_length = config.docstring_default_arg_max_length
+    render_default.clear()
+    result_cache.enabled = (config.docstring_default_arg_persistent_cache or
+                            config.docstring_default_arg_env_cache)
+    result_cache.used = {} if config.docstring_default_arg_env_cache else None
+    result_cache.maxsize = config.docstring_default_arg_persistent_cache_size
+    plan_cache.maxsize = config.docstring_default_arg_plan_cache_size
+    plan_cache.clear()
+    # Results and signatures depend on the config
+    introspect.clear()
+    source_signatures.enabled = config.docstring_default_arg_source_defaults
+    instrument.enabled = config.docstring_default_arg_instrumentation
+    instrument.profiler = None
+    if instrument.enabled and (
+            config.docstring_default_arg_instrumentation_profile):
+        from cProfile import Profile
+        instrument.profiler = Profile()
+
+
+def _result_cache_path(app: 'Sphinx') -> str:
+    return os.path.join(app.doctreedir, 'defaultargs_cache.json')
+
+
+def load_result_cache(app: 'Sphinx') -> None:
+    """Fill the result cache from its file and from the environment.
+
+    The file is not read into a fresh environment, e.g. with ``-E``,
+    which has no document read yet.
+    """
+    result_cache.clear()
+    if app.config.docstring_default_arg_persistent_cache and getattr(
+            app.env, 'all_docs', None):
+        result_cache.load(_result_cache_path(app))
+    results = getattr(app.env, 'defaultargs_results', None)
+    if result_cache.enabled and results is not None:
+        result_cache.update(results)
+
+
+def save_result_cache(app: 'Sphinx', exception: Optional[Exception]) -> None:
+    if not result_cache.enabled:
+        return
+    total = result_cache.hits + result_cache.misses
+    if total:
+        logger.info('sphinx_autodoc_defaultargs: result cache hit rate '
+                    '%d/%d (%.1f%%)', result_cache.hits, total,
+                    100. * result_cache.hits / total)
+    if not app.config.docstring_default_arg_persistent_cache:
+        return
+    if exception is None and result_cache.modified:
+        try:
+            os.makedirs(app.doctreedir, exist_ok=True)
+            result_cache.save(_result_cache_path(app))
+        except OSError as error:
+            logger.warning('sphinx_autodoc_defaultargs: cannot save the '
+                           'persistent cache: %s', error)
+
+
+def init_env_cache(app: 'Sphinx') -> None:
+    """Keep processed docstrings in the environment, if configured.
+
+    ``defaultargs_results`` holds every docstring once, encoded
+    by :meth:`ResultCache.encode`, and ``defaultargs_documents``
+    the keys of the docstrings of each document, so that the results
+    of parallel readers are merged and those of previous builds
+    are purged with their documents.
+    """
+    env = app.env
+    if not app.config.docstring_default_arg_env_cache:
+        for attr in ['defaultargs_results', 'defaultargs_documents']:
+            if hasattr(env, attr):
+                delattr(env, attr)
+    elif not hasattr(env, 'defaultargs_results'):
+        env.defaultargs_results = {}  # type: Dict[str, str]
+        env.defaultargs_documents = {}  # type: Dict[str, List[str]]
+
+
+def record_results(app: 'Sphinx', doctree: Any) -> None:
+    """Move the results used by the document read to the environment."""
+    used = result_cache.used
+    documents = getattr(app.env, 'defaultargs_documents', None)
+    if used is None or documents is None:
+        return
+    results = app.env.defaultargs_results
+    documents[app.env.docname] = list(used)
+    for key, lines in used.items():
+        if key not in results:
+            results[key] = result_cache.encode(lines)
+    used.clear()
+
+
+def merge_results(app: 'Sphinx', env: Any, docnames: Collection[str],
+                  other: Any) -> None:
+    documents = getattr(env, 'defaultargs_documents', None)
+    other_documents = getattr(other, 'defaultargs_documents', None)
+    if documents is None or other_documents is None:
+        return
+    results, other_results = env.defaultargs_results, other.defaultargs_results
+    merged = {}
+    for docname in docnames:
+        keys = documents[docname] = other_documents.get(docname, [])
+        for key in keys:
+            if key not in results:
+                results[key] = merged[key] = other_results[key]
+    # Also for the readers started later and for the cache file
+    result_cache.update(merged)
+
+
+def purge_results(app: 'Sphinx', env: Any, docname: str) -> None:
+    documents = getattr(env, 'defaultargs_documents', None)
+    if documents is not None:
+        documents.pop(docname, None)
+
+
+def prune_results(app: 'Sphinx', env: Any) -> None:
+    """Drop the results of the environment no document uses anymore."""
+    documents = getattr(env, 'defaultargs_documents', None)
+    if documents is None:
+        return
+    used = set(itertools.chain.from_iterable(documents.values()))
+    results = env.defaultargs_results
+    for key in [key for key in results if key not in used]:
+        del results[key]
+
+
+def init_no_signature(app: 'Sphinx') -> None:
+    """Share the names of :class:`NoSignatureCache` with the environment,
+    which keeps them until it is built afresh."""
+    env = app.env
+    if not isinstance(getattr(env, 'defaultargs_no_signature', None), dict):
+        env.defaultargs_no_signature = {}  # type: Dict[str, str]
+    no_signature.names = env.defaultargs_no_signature
+    no_signature.hits = 0
+
+
+def merge_no_signature(app: 'Sphinx', env: Any, docnames: Collection[str],
+                       other: Any) -> None:
+    names = getattr(other, 'defaultargs_no_signature', None)
+    if names:
+        env.defaultargs_no_signature.update(names)
+
+
+def warm_up_callable(obj: Any) -> bool:
+    """Introspect what :func:`process_docstring` needs of ``obj``.
+
+    Returns:
+        Whether ``obj`` is cached in ``introspect``.
+    """
+    func = documented_callable(obj)
+    if func is None:
+        return False
+    info = introspect(func)
+    try:
+        if info.default_args:
+            # Computed on first access, and kept
+            info.args
+            info.is_static
+    except (TypeError, ValueError):
+        # No signature
+        return False
+    info.compact()
+    return func in introspect
+
+
+# Whether the garbage collector was frozen by ``warm_up``
+_frozen = False
+
+
+def warm_up(app: 'Sphinx', env: Any, docnames: Collection[str]) -> None:
+    """Introspect the callables of ``docstring_default_arg_warmup``
+    before any document is read.
+
+    The packages and their public submodules are imported,
+    and the signatures, default arguments, escaped argument names
+    and member kinds of owner classes of their public callables
+    (see :func:`public_objects`) are cached, up to the size of the cache.
+    Parallel readers forked afterwards inherit them.
+    """
+    global _frozen
+    import gc
+    import importlib
+
+    packages = app.config.docstring_default_arg_warmup
+    if not packages or not docnames:
+        return
+    start = time.perf_counter()
+    count = 0
+    for package in packages:
+        try:
+            modnames = list(iter_module_names(package))
+        except Exception as error:
+            logger.warning('sphinx_autodoc_defaultargs: cannot import %s '
+                           'to warm up: %s: %s', package,
+                           type(error).__name__, error)
+            continue
+        for modname in modnames:
+            try:
+                module = importlib.import_module(modname)
+            except Exception as error:
+                logger.warning('sphinx_autodoc_defaultargs: cannot import '
+                               '%s to warm up: %s: %s', modname,
+                               type(error).__name__, error)
+                continue
+            for _, _, obj in public_objects(module):
+                if count < introspect.maxsize and warm_up_callable(obj):
+                    count += 1
+    logger.info('sphinx_autodoc_defaultargs: %d callables introspected '
+                'in %.3f s', count, time.perf_counter() - start)
+
+    if app.parallel > 1 and hasattr(gc, 'freeze'):
+        # Keep the collector of forked readers from writing to
+        # (and thus copying) the pages of the objects inherited
+        gc.freeze()
+        _frozen = True
+
+
+def end_warm_up(app: 'Sphinx', env: Any) -> None:
+    global _frozen
+    import gc
+
+    if _frozen:
+        gc.unfreeze()
+        _frozen = False
+
+
+def init_budgets(app: 'Sphinx') -> None:
+    # Records of documents not read again are kept
+    if not hasattr(app.env, 'defaultargs_budgets'):
+        app.env.defaultargs_budgets = {}
+
+
+def merge_budgets(app: 'Sphinx', env: Any, docnames: Collection[str],
+                  other: Any) -> None:
+    records = getattr(other, 'defaultargs_budgets', {})
+    env.defaultargs_budgets.update((docname, records[docname])
+                                   for docname in docnames
+                                   if docname in records)
+
+
+def purge_budgets(app: 'Sphinx', env: Any, docname: str) -> None:
+    getattr(env, 'defaultargs_budgets', {}).pop(docname, None)
+
+
+def report_budgets(app: 'Sphinx', exception: Optional[Exception]) -> None:
+    """Log the objects exceeding a budget of :func:`process_lines`."""
+    records = getattr(app.env, 'defaultargs_budgets', None)
+    if not records:
+        return
+    logger.info('sphinx_autodoc_defaultargs: %d objects exceeded a budget',
+                sum(map(len, records.values())))
+    for docname, doc_records in sorted(records.items()):
+        for name, what, message in doc_records:
+            logger.info('  %s %s (%s): %s', what, name, docname, message)
+
+
+def index_entry(what: str, obj: Any, func: Optional[Callable]
+                ) -> Optional[Dict[str, Any]]:
+    """Entry of the default argument index for ``obj`` documented
+    as ``what``, None if there is nothing to index.
+
+    ``params`` lists ``[name, kind, rendered default or None]``
+    of all arguments of the callables with default arguments,
+    as documented, i.e. without the first argument of methods.
+    Classes have the ``module.qualname`` of their ``bases``
+    in MRO order, and their own as ``defined``.
+    """
+    entry = {'what': what}  # type: Dict[str, Any]
+    if inspect.isclass(obj):
+        entry['bases'] = [name for name in map(
+            qualified_name, obj.__mro__[1:]) if name not in (
+            None, 'builtins.object')]
+        entry['defined'] = qualified_name(obj)
+
+    if func is not None and func not in no_signature:
+        info = introspect(func)
+        try:
+            default_args = info.default_args
+            parameters = list(info.signature.parameters.values())
+        except (TypeError, ValueError):
+            default_args = None
+        if default_args:
+            # Not of bound methods, e.g. classmethods, already without it
+            if what in bound_kinds and not info.is_static and (
+                    not inspect.ismethod(func)) and (
+                    parameters and parameters[0].kind in (
+                        inspect.Parameter.POSITIONAL_ONLY,
+                        inspect.Parameter.POSITIONAL_OR_KEYWORD)):
+                parameters = parameters[1:]
+            entry['params'] = [
+                [param.name, param.kind.name,
+                 None if param.default is inspect.Parameter.empty
+                 else render_default(param.default)]
+                for param in parameters]
+    if len(entry) == 1:
+        return None
+    return entry
+
+
+def init_index(app: 'Sphinx') -> None:
+    """Keep the entries of ``docstring_default_arg_index`` in the
+    environment, by document, like the processed docstrings."""
+    env = app.env
+    if not app.config.docstring_default_arg_index:
+        if hasattr(env, 'defaultargs_index'):
+            del env.defaultargs_index
+    elif not hasattr(env, 'defaultargs_index'):
+        env.defaultargs_index = {}  # type: Dict[str, Dict[str, dict]]
+
+
+def record_index(app: 'Sphinx', what: str, name: str, obj: Any,
+                 func: Optional[Callable]) -> None:
+    env = getattr(app, 'env', None)
+    documents = getattr(env, 'defaultargs_index', None)
+    if documents is None:
+        return
+    entries = documents.setdefault(env.docname, {})
+    if name not in entries:
+        entry = index_entry(what, obj, func)
+        if entry is not None:
+            entries[name] = entry
+
+
+def merge_index(app: 'Sphinx', env: Any, docnames: Collection[str],
+                other: Any) -> None:
+    documents = getattr(env, 'defaultargs_index', None)
+    other_documents = getattr(other, 'defaultargs_index', {})
+    if documents is not None:
+        documents.update((docname, other_documents[docname])
+                         for docname in docnames
+                         if docname in other_documents)
 
-def setup(app: Sphinx) -> Dict[str, bool]:
+
+def purge_index(app: 'Sphinx', env: Any, docname: str) -> None:
+    getattr(env, 'defaultargs_index', {}).pop(docname, None)
+
+
+class DefaultArgsIndex(object):
+    """Default arguments written by ``docstring_default_arg_index``,
+    looked up without importing the documented modules.
+
+    ``entries`` maps the documented names to entries of
+    :func:`index_entry`. Members not documented themselves are
+    found in the bases of their class, as far as documented
+    in this index or in those added by :meth:`update`,
+    e.g. the index of an upstream project.
+    """
+
+    version = 1
+    header = '# Sphinx default argument index version {}\n'.format(version)
+
+    def __init__(self, entries: Optional[Dict[str, dict]] = None,
+                 project: str = '', release: str = '') -> None:
+        self.entries = {}  # type: Dict[str, dict]
+        # Name where defined -> documented name
+        self.aliases = {}  # type: Dict[str, str]
+        self.project = project
+        self.release = release
+        self.update(entries or {})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def update(self, entries: Union['DefaultArgsIndex', Dict[str, dict]]
+               ) -> None:
+        if isinstance(entries, DefaultArgsIndex):
+            entries = entries.entries
+        self.entries.update(entries)
+        for name, entry in entries.items():
+            defined = entry.get('defined')
+            if defined and defined != name:
+                self.aliases[defined] = name
+
+    def find(self, name: str) -> Optional[dict]:
+        """Entry with the parameters of ``name``, possibly inherited."""
+        entry = self.entries.get(self.aliases.get(name, name))
+        if entry is not None and 'params' in entry:
+            return entry
+        owner, _, attr = name.rpartition('.')
+        cls = self.entries.get(self.aliases.get(owner, owner), {})
+        for base in cls.get('bases', ()):
+            entry = self.entries.get('{}.{}'.format(
+                self.aliases.get(base, base), attr))
+            if entry is not None and 'params' in entry:
+                return entry
+        return None
+
+    def parameters(self, name: str
+                   ) -> Optional[List[Tuple[str, str, Optional[str]]]]:
+        """``(name, kind, rendered default or None)`` of all arguments
+        of ``name``, None if it has no default arguments indexed."""
+        entry = self.find(name)
+        return None if entry is None else [
+            tuple(param) for param in entry['params']]
+
+    def defaults(self, name: str) -> Optional[OrderedDictType[str, str]]:
+        """Rendered default values of ``name`` by argument."""
+        parameters = self.parameters(name)
+        return None if parameters is None else OrderedDict(
+            (argname, default) for argname, _, default in parameters
+            if default is not None)
+
+    def dumps(self) -> bytes:
+        """The index as written by Sphinx, in the format of
+        ``objects.inv``: a few header lines, then the entries
+        as JSON compressed by :mod:`zlib`."""
+        import zlib
+
+        header = self.header + (
+            '# Project: {}\n# Version: {}\n'
+            '# The remainder of this file is compressed using zlib.\n'
+        ).format(self.project, self.release)
+        data = json.dumps(self.entries, sort_keys=True,
+                          separators=(',', ':'))
+        return header.encode('utf-8') + zlib.compress(data.encode('utf-8'))
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'DefaultArgsIndex':
+        import zlib
+
+        lines = data.split(b'\n', 4)
+        if len(lines) < 5 or lines[0].decode('utf-8') + '\n' != cls.header:
+            raise ValueError('not a default argument index of version {}'
+                             .format(cls.version))
+        project, release = (line.decode('utf-8').split(': ', 1)[-1]
+                            for line in lines[1:3])
+        return cls(json.loads(zlib.decompress(lines[4]).decode('utf-8')),
+                   project, release)
+
+    @classmethod
+    def load(cls, path: str) -> 'DefaultArgsIndex':
+        """Read the index written to ``path``,
+        e.g. ``_build/html/defaultargs.inv``."""
+        with open(path, 'rb') as f:
+            return cls.loads(f.read())
+
+
+def write_index(app: 'Sphinx', exception: Optional[Exception]) -> None:
+    """Write ``defaultargs.inv`` to the output directory,
+    see :class:`DefaultArgsIndex`."""
+    documents = getattr(app.env, 'defaultargs_index', None)
+    if documents is None or exception is not None:
+        return
+    index = DefaultArgsIndex(project=app.config.project,
+                             release=app.config.release)
+    for docname in sorted(documents):
+        index.update(documents[docname])
+    os.makedirs(app.outdir, exist_ok=True)
+    path = os.path.join(app.outdir, 'defaultargs.inv')
+    with open(path, 'wb') as f:
+        f.write(index.dumps())
+    logger.info('sphinx_autodoc_defaultargs: %d objects indexed in %s',
+                len(index), path)
+
+
+def init_instrumentation(app: 'Sphinx') -> None:
+    # Records of previous builds are dropped with the environment
+    if instrument.enabled:
+        app.env.defaultargs_records = {}
+        app.env.defaultargs_profiles = {}
+
+
+def snapshot_profile(app: 'Sphinx', doctree: Any) -> None:
+    if instrument.profiler is not None:
+        instrument.snapshot_profile(app.env)
+
+
+def merge_instrumentation(app: 'Sphinx', env: Any, docnames: Collection[str],
+                          other: Any) -> None:
+    for attr in ['defaultargs_records', 'defaultargs_profiles']:
+        merged, records = getattr(env, attr, None), getattr(other, attr, {})
+        if merged is not None:
+            merged.update((docname, records[docname])
+                          for docname in docnames if docname in records)
+
+
+def report_instrumentation(app: 'Sphinx',
+                           exception: Optional[Exception]) -> None:
+    records = getattr(app.env, 'defaultargs_records', None)
+    if not instrument.enabled or records is None:
+        return
+    report = instrument.report(
+        records, app.config.docstring_default_arg_instrumentation_top)
+    os.makedirs(app.outdir, exist_ok=True)
+    path = os.path.join(app.outdir, 'defaultargs_report.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    logger.info('sphinx_autodoc_defaultargs: %d objects processed in '
+                '%.3f s, report written to %s',
+                report['objects'], report['seconds'], path)
+    for record in report['slowest']:
+        logger.info('  %8.3f ms %s %s (%s)', record['seconds'] * 1e3,
+                    record['what'], record['name'], record['docname'])
+
+    stats = instrument.merge_profiles(
+        app.env.defaultargs_profiles.values())
+    if stats is not None:
+        path = os.path.join(app.outdir, 'defaultargs.prof')
+        stats.dump_stats(path)
+        logger.info('sphinx_autodoc_defaultargs: profile written to %s',
+                    path)
+
+
+def setup(app: 'Sphinx') -> Dict[str, bool]:
     app.add_config_value('always_document_default_args', False, 'html')
     app.add_config_value('docstring_default_arg_flags',
                          [('(Default: ', ')')], 'html')
@@ -480,7 +3260,430 @@ def setup(app: Sphinx) -> Dict[str, bool]:
         False, 'html')
     app.add_config_value('docstring_default_arg_substitution',
                          '|default|', 'html')
+    app.add_config_value('docstring_default_arg_cache_size', 4096, '')
+    app.add_config_value('docstring_default_arg_plan_cache_size', 1024, '')
+    app.add_config_value('docstring_default_arg_max_length', None, 'html')
+    app.add_config_value('docstring_default_arg_source_defaults', False,
+                         'html')
+    app.add_config_value('docstring_default_arg_napoleon', False, 'env')
+    app.add_config_value('docstring_default_arg_persistent_cache', False, '')
+    app.add_config_value('docstring_default_arg_env_cache', False, '')
+    app.add_config_value('docstring_default_arg_warmup', [], '')
+    app.add_config_value('docstring_default_arg_index', False, 'env')
+    app.add_config_value('docstring_default_arg_max_lines', None, 'env')
+    app.add_config_value('docstring_default_arg_max_params', None, 'env')
+    app.add_config_value('docstring_default_arg_time_limit', None, 'env')
+    app.add_config_value('docstring_default_arg_persistent_cache_size',
+                         10000, '')
+    app.add_config_value('docstring_default_arg_instrumentation', False, '')
+    app.add_config_value('docstring_default_arg_instrumentation_top', 10, '')
+    app.add_config_value('docstring_default_arg_instrumentation_profile',
+                         False, '')
     # app.add_config_value('docstring_default_arg_parenthesis', True, 'html')
 
+    app.connect('config-inited', init_caches)
+    app.connect('config-inited', init_napoleon)
+    app.connect('builder-inited', init_env_cache)
+    app.connect('builder-inited', load_result_cache)
+    app.connect('builder-inited', init_instrumentation)
+    app.connect('builder-inited', init_budgets)
+    app.connect('builder-inited', init_no_signature)
+    app.connect('builder-inited', init_index)
+    app.connect('env-before-read-docs', warm_up)
     app.connect('autodoc-process-docstring', process_docstring)
-    return dict(parallel_read_safe=True)
+    app.connect('doctree-read', snapshot_profile)
+    app.connect('doctree-read', record_results)
+    app.connect('env-merge-info', merge_instrumentation)
+    app.connect('env-merge-info', merge_results)
+    app.connect('env-merge-info', merge_budgets)
+    app.connect('env-merge-info', merge_no_signature)
+    app.connect('env-merge-info', merge_index)
+    app.connect('env-purge-doc', purge_results)
+    app.connect('env-purge-doc', purge_budgets)
+    app.connect('env-purge-doc', purge_index)
+    app.connect('env-updated', prune_results)
+    app.connect('env-updated', end_warm_up)
+    app.connect('build-finished', save_result_cache)
+    app.connect('build-finished', report_instrumentation)
+    app.connect('build-finished', report_budgets)
+    app.connect('build-finished', write_index)
+    # State is per process: caches only hold what a process computed
+    # itself, and data needed after reading in parallel is kept
+    # in the environment. Nothing runs while writing.
+    return dict(parallel_read_safe=True, parallel_write_safe=True)
+
+
+# Config values read from a configuration file by the command line
+_config_prefixes = ('always_document_default_args', 'docstring_default_arg_',
+                    'napoleon_')
+
+
+class CommandLineApp(object):
+    """Just enough of a Sphinx application to process docstrings
+    without building, configured like in ``conf.py``.
+
+    Docstrings are converted by :mod:`sphinx.ext.napoleon` first
+    if it is in ``extensions``.
+    """
+
+    def __init__(self, overrides: Optional[Dict[str, Any]] = None) -> None:
+        self.config = types.SimpleNamespace()
+        setup(self)
+        overrides = overrides or {}
+        self.napoleon = 'sphinx.ext.napoleon' in overrides.get(
+            'extensions', ())
+        if self.napoleon:
+            from sphinx.ext.napoleon import Config
+            for name, (default, _) in Config._config_values.items():
+                setattr(self.config, name, default)
+        for name, value in overrides.items():
+            if hasattr(self.config, name):
+                setattr(self.config, name, value)
+        # No environment to keep the results in
+        self.config.docstring_default_arg_env_cache = False
+        init_caches(self, self.config)
+
+    def add_config_value(self, name: str, default: Any, rebuild: str,
+                         valid_types: Any = ()) -> None:
+        setattr(self.config, name, default)
+
+    def connect(self, event: str, callback: Callable,
+                priority: int = 500) -> None:
+        pass
+
+    def process(self, what: str, name: str, obj: Any, lines: List[str],
+                info: Optional[SourceIntrospection] = None) -> None:
+        """Process ``lines`` like autodoc with the extensions.
+
+        The arguments are those of ``info`` instead of ``obj`` if given.
+        """
+        if self.napoleon and info is None and (
+                self.config.docstring_default_arg_napoleon):
+            process_napoleon_docstring(self, what, name, obj, None, lines)
+            return
+        if self.napoleon:
+            from sphinx.ext.napoleon.docstring import (
+                GoogleDocstring, NumpyDocstring)
+            if self.config.napoleon_numpy_docstring:
+                lines[:] = NumpyDocstring(lines, self.config, None, what,
+                                          name, obj).lines()
+            if self.config.napoleon_google_docstring:
+                lines[:] = GoogleDocstring(lines, self.config, None, what,
+                                           name, obj).lines()
+        if info is None:
+            process_docstring(self, what, name, obj, None, lines)
+        else:
+            process_lines_within_budgets(self, what, name, lines, info)
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """Config values of ``conf.py`` or a TOML file.
+
+    The values of ``pyproject.toml`` are
+    in the ``[tool.sphinx_autodoc_defaultargs]`` table.
+    """
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            config = tomllib.load(f)
+        if os.path.basename(path) == 'pyproject.toml':
+            config = config.get('tool', {}).get(
+                'sphinx_autodoc_defaultargs', {})
+    else:
+        from sphinx.config import eval_config_file
+        config = eval_config_file(os.path.abspath(path), None)
+    return {name: value for name, value in config.items()
+            if name == 'extensions' or name.startswith(_config_prefixes)}
+
+
+def public_objects(module: Any) -> Iterable[Tuple[str, str, Any]]:
+    """``(name, what, obj)`` of the public callables defined in
+    ``module``, including methods and properties of classes."""
+    for name, member in list(vars(module).items()):
+        if name.startswith('_') or getattr(
+                member, '__module__', None) != module.__name__:
+            continue
+        name = '{}.{}'.format(module.__name__, name)
+        if inspect.isclass(member):
+            yield name, 'class', member
+            for attr, value in list(vars(member).items()):
+                if attr.startswith('_'):
+                    continue
+                if isinstance(value, property):
+                    yield '{}.{}'.format(name, attr), 'property', value
+                elif isinstance(value, (staticmethod, classmethod)) or (
+                        inspect.isfunction(value)):
+                    yield ('{}.{}'.format(name, attr), 'method',
+                           getattr(member, attr))
+        elif callable(member):
+            yield name, 'function', member
+
+
+def source_objects(modname: str, source: str, tree: ast.AST
+                   ) -> Iterable[Tuple[str, str, Optional[str],
+                                       SourceFunction]]:
+    """``(name, what, docstring, function)`` of the public callables
+    defined at the top level of a module, like :func:`public_objects`
+    from its AST."""
+    functions = (ast.FunctionDef, ast.AsyncFunctionDef)
+    for node in tree.body:
+        if not isinstance(node, functions + (ast.ClassDef,)) or (
+                node.name.startswith('_')):
+            continue
+        name = '{}.{}'.format(modname, node.name)
+        if isinstance(node, functions):
+            yield (name, 'function', ast.get_docstring(node),
+                   source_function(source, node))
+            continue
+
+        methods = {child.name: child for child in node.body
+                   if isinstance(child, functions)}
+        init = methods.get('__init__', methods.get('__new__'))
+        if init is not None:
+            yield (name, 'class', ast.get_docstring(node),
+                   source_function(source, init))
+        for child in node.body:
+            if not isinstance(child, functions) or (
+                    child.name.startswith('_')):
+                continue
+            function = source_function(source, child)
+            if any(decorator.endswith(('.setter', '.deleter'))
+                   for decorator in function.decorators):
+                continue
+            yield ('{}.{}'.format(name, child.name),
+                   'property' if 'property' in function.decorators
+                   else 'method', ast.get_docstring(child), function)
+
+
+def iter_source_modules(name: str) -> Iterable[Tuple[str, Optional[str]]]:
+    """``(modname, path)`` of ``name`` and its public submodules
+    found without importing them, see :func:`iter_module_names`.
+
+    ``path`` is None for modules without Python source.
+    """
+    import importlib.machinery
+    import pkgutil
+
+    spec = None
+    search = None  # type: Optional[List[str]]
+    for i, part in enumerate(name.split('.')):
+        spec = importlib.machinery.PathFinder.find_spec(part, search)
+        if spec is None:
+            raise ImportError('No module named {!r}'.format(
+                '.'.join(name.split('.')[:i + 1])), name=name)
+        search = spec.submodule_search_locations
+
+    def walk(modname: str, spec: Any) -> Iterable[Tuple[str, Optional[str]]]:
+        origin = spec.origin
+        yield modname, origin if origin and origin.endswith('.py') else None
+        for info in pkgutil.iter_modules(
+                spec.submodule_search_locations or []):
+            if not info.name.startswith('_'):
+                subspec = info.module_finder.find_spec(info.name)
+                if subspec is not None:
+                    yield from walk(modname + '.' + info.name, subspec)
+
+    yield from walk(name, spec)
+
+
+def iter_module_names(name: str) -> Iterable[str]:
+    """``name`` and the names of its public submodules."""
+    import importlib
+    import pkgutil
+
+    yield name
+    path = getattr(importlib.import_module(name), '__path__', None)
+    if path is None:
+        return
+    for info in pkgutil.walk_packages(path, name + '.',
+                                      onerror=lambda _: None):
+        if not any(part.startswith('_')
+                   for part in info.name[len(name) + 1:].split('.')):
+            yield info.name
+
+
+_cli_app = None  # type: Optional[CommandLineApp]
+
+
+def _init_cli_worker(path: List[str], overrides: Dict[str, Any]) -> None:
+    global _cli_app
+    sys.path[:] = path
+    _cli_app = CommandLineApp(overrides)
+
+
+def process_module(modname: str, path: Optional[str] = None
+                   ) -> Tuple[str, List[Tuple[str, str, List[str]]],
+                              Optional[str]]:
+    """Processed docstrings of the callables with default arguments
+    in a module, see :func:`public_objects`.
+
+    If the ``path`` of the module source is given, the module is not
+    imported, but read with :func:`source_objects`.
+
+    Returns:
+        ``(modname, [(name, what, lines)], error)``.
+    """
+    import importlib
+
+    from sphinx.util.docstrings import prepare_docstring
+
+    if path is not None:
+        return process_source_module(modname, path)
+    try:
+        module = importlib.import_module(modname)
+    except Exception as error:
+        return modname, [], '{}: {}'.format(type(error).__name__, error)
+
+    results = []
+    for name, what, obj in public_objects(module):
+        func = documented_callable(obj)
+        try:
+            if func is None or not introspect(func).default_args:
+                continue
+        except (TypeError, ValueError):
+            # No signature
+            continue
+        doc = inspect.getdoc(obj)
+        lines = prepare_docstring(doc) if doc else []
+        _cli_app.process(what, name, obj, lines)
+        results.append((name, what, lines))
+    return modname, results, None
+
+
+def process_source_module(modname: str, path: str
+                          ) -> Tuple[str, List[Tuple[str, str, List[str]]],
+                                     Optional[str]]:
+    """Like :func:`process_module` from the source file ``path``."""
+    from sphinx.util.docstrings import prepare_docstring
+
+    try:
+        objects = list(source_objects(modname, *parse_source(path)))
+    except (OSError, SyntaxError, ValueError) as error:
+        return modname, [], '{}: {}'.format(type(error).__name__, error)
+
+    results = []
+    for name, what, doc, function in objects:
+        info = SourceIntrospection(function)
+        if not info.default_args:
+            continue
+        lines = prepare_docstring(doc) if doc else []
+        _cli_app.process(what, name, None, lines, info)
+        results.append((name, what, lines))
+    return modname, results, None
+
+
+def format_rst(results: Iterable[Tuple[str, List[Tuple[str, str, List[str]]]]]
+               ) -> str:
+    """reST of processed docstrings, as Python domain directives."""
+    out = []
+    for modname, objects in results:
+        if not objects:
+            continue
+        out += [modname, '=' * len(modname), '']
+        for name, what, lines in objects:
+            out += ['.. py:{}:: {}'.format(what, name), '']
+            out += [('   ' + line).rstrip() for line in lines]
+            out.append('')
+    return '\n'.join(out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Process the docstrings of packages without Sphinx.
+
+    See ``python -m sphinx_autodoc_defaultargs --help``.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m sphinx_autodoc_defaultargs',
+        description='Document default arguments of the public callables '
+        'of packages and modules like in a Sphinx build.')
+    parser.add_argument('modules', nargs='+', metavar='MODULE',
+                        help='packages or modules, with their public '
+                        'submodules')
+    parser.add_argument('-c', '--config', metavar='FILE',
+                        help='conf.py, or a TOML file with the same values '
+                        '(in [tool.sphinx_autodoc_defaultargs] of '
+                        'pyproject.toml)')
+    parser.add_argument('-f', '--format', choices=['json', 'rst'],
+                        default='json')
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='output file instead of stdout')
+    parser.add_argument('-j', '--jobs', default='1',
+                        help='number of processes, or "auto"')
+    parser.add_argument('--no-import', action='store_true',
+                        help='read the modules from their source without '
+                        'importing them, with default values as written')
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = load_config(args.config) if args.config else {}
+    except ImportError as error:
+        parser.error('cannot read {}: {}'.format(args.config, error))
+    jobs = os.cpu_count() or 1 if args.jobs == 'auto' else int(args.jobs)
+
+    _init_cli_worker(sys.path, overrides)
+    modules = []  # type: List[Tuple[str, Optional[str]]]
+    status = 0
+    for name in args.modules:
+        if not args.no_import:
+            try:
+                modnames = list(iter_module_names(name))
+            except Exception as error:
+                print('{}: {}: {}'.format(name, type(error).__name__, error),
+                      file=sys.stderr)
+                status = 1
+            else:
+                modules.extend((modname, None) for modname in modnames)
+            continue
+        try:
+            for modname, path in iter_source_modules(name):
+                if path is None:
+                    print('{}: no Python source'.format(modname),
+                          file=sys.stderr)
+                    status = 1
+                else:
+                    modules.append((modname, path))
+        except ImportError as error:
+            print('{}: {}'.format(name, error), file=sys.stderr)
+            status = 1
+
+    if jobs > 1 and len(modules) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+                jobs, initializer=_init_cli_worker,
+                initargs=(sys.path, overrides)) as executor:
+            processed = list(executor.map(process_module, *zip(*modules)))
+    else:
+        processed = [process_module(modname, path)
+                     for modname, path in modules]
+
+    for modname, _, error in processed:
+        if error is not None:
+            print('{}: {}'.format(modname, error), file=sys.stderr)
+            status = 1
+
+    if args.format == 'json':
+        text = json.dumps(collections.OrderedDict(
+            (name, dict(what=what, lines=lines))
+            for _, objects, _ in processed for name, what, lines in objects),
+            indent=2, ensure_ascii=False)
+    else:
+        text = format_rst((modname, objects)
+                          for modname, objects, _ in processed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return status
+
+
+if __name__ == '__main__':
+    # Run in the imported module, not a copy of it as ``__main__``
+    from sphinx_autodoc_defaultargs import main as _main
+    sys.exit(_main())
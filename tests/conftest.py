@@ -36,7 +36,9 @@ def remove_sphinx_projects(sphinx_test_tempdir):
     roots_path = pathlib.Path(sphinx_test_tempdir)
     for entry in roots_path.iterdir():
         try:
-            if entry.is_dir() and pathlib.Path(entry, '_build').exists():
+            # Not the ``*current`` links of pytest to removed directories
+            if entry.is_dir() and not entry.is_symlink() and pathlib.Path(
+                    entry, '_build').exists():
                 shutil.rmtree(str(entry))
         except PermissionError:
             pass
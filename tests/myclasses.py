@@ -59,3 +59,26 @@ class __MyFunctor(object):
         pass
     __staticmethod = _staticmethod
     _classmethod = _classmethod_
+
+
+class Outer(object):
+    class Inner(object):
+        @staticmethod
+        def static(x=0):
+            pass
+
+        @classmethod
+        def cls(cls, x=0):
+            pass
+
+        def method(self, x=0):
+            pass
+
+        @staticmethod
+        def __private(x=0):
+            pass
+
+
+class Derived(Outer.Inner):
+    def static(self, x=0):
+        pass
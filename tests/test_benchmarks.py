@@ -0,0 +1,91 @@
+import json
+import pathlib
+import sys
+
+import pytest
+
+BENCHMARKS = pathlib.Path(__file__).parent.parent / 'benchmarks'
+if str(BENCHMARKS) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS))
+
+import bench_defaultargs  # noqa: E402 isort:skip
+import corpus  # noqa: E402 isort:skip
+
+
+@pytest.mark.parametrize('style', corpus.STYLES)
+def test_corpus(style):
+    func = corpus.make_function(6, 2, style)
+    assert list(func.__kwdefaults__) == ['param_4', 'param_5']
+    lines = corpus.docstring_lines(func, style)
+    assert lines.count(corpus.FILLER) == 2
+    assert (':param param_0: Description of ``param_0``. '
+            '(Default: ``None``)') in lines
+    assert ':type param_2: int' in lines
+    assert not any(line.startswith(':param param_1:') for line in lines)
+
+
+def test_growth_exponent():
+    growth_exponent = bench_defaultargs.growth_exponent
+    assert growth_exponent([1, 2, 4], [3, 6, 12]) == pytest.approx(1)
+    assert growth_exponent([1, 2, 4], [1, 4, 16]) == pytest.approx(2)
+
+
+def test_benchmarks(tmp_path, capsys):
+    baseline = str(tmp_path / 'baseline.json')
+    argv = ['--styles', 'rest', '--params', '2', '4', '--lines', '1', '2',
+            '--min-time', '0', '--repeat', '1', '--slack', '100',
+            '--import-runs', '1', '--objects', '10']
+    assert bench_defaultargs.main(argv + ['--save-baseline', baseline]) == 0
+    with open(baseline) as f:
+        results = json.load(f)
+    assert 'process_docstring[rest,params=4,lines=10]' in results
+    assert 'match_field[rest,params=16,lines=2]' in results
+    assert 'import sphinx_autodoc_defaultargs' in results
+    assert results[
+        'memory[rest,params=16,lines=10] retained per 1000 objects'] > 0
+
+    for key in results:
+        results[key] /= 1000
+    with open(baseline, 'w') as f:
+        json.dump(results, f)
+    assert bench_defaultargs.main(
+        argv + ['--baseline', baseline, '--check']) == 1
+    assert 'REGRESSION' in capsys.readouterr().out
+
+
+def test_memory_only(tmp_path):
+    baseline = str(tmp_path / 'baseline.json')
+    argv = ['--styles', 'rest', '--objects', '10', '--memory-only']
+    assert bench_defaultargs.main(argv + ['--save-baseline', baseline]) == 0
+    with open(baseline) as f:
+        results = json.load(f)
+    assert results and all(key.startswith('memory[') for key in results)
+    # The same whatever ran before
+    assert bench_defaultargs.main(
+        argv + ['--baseline', baseline, '--check']) == 0
+
+
+def test_import_time():
+    seconds, imported = bench_defaultargs.import_time(runs=1)
+    assert 'sphinx_autodoc_defaultargs' in imported
+    assert not [name for name in imported
+                if name.split('.')[0] in ('sphinx', 'docutils')]
+    assert seconds > 0
+
+
+def test_build(tmp_path):
+    results = bench_defaultargs.bench_build(
+        str(tmp_path), 1, 'google', modules=1, functions=2, n_params=3,
+        doc_lines=1)
+    assert set(results) == {'with', 'without'}
+    text = (tmp_path / '_build' / 'enabled' /
+            'synthetic.mod_0.txt').read_text()
+    assert '* **param_1** (*optional*) -- Default: "0"' in text
+
+
+def test_scaling(tmp_path):
+    results = bench_defaultargs.bench_scaling(
+        str(tmp_path), 2, 'rest', modules=2, functions=2, n_params=3,
+        doc_lines=1)
+    assert set(results) == {'serial', 'parallel'}
+    assert (tmp_path / '_build' / 'parallel' / 'synthetic.mod_1.txt').exists()
@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import pathlib
+import pickle
+import sys
+
+import pytest
+from sphinx.application import Sphinx
+from sphinx.util.parallel import parallel_available
+
+import sphinx_autodoc_defaultargs
+
+BENCHMARKS = pathlib.Path(__file__).parent.parent / 'benchmarks'
+if str(BENCHMARKS) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS))
+
+import corpus  # noqa: E402 isort:skip
+
+pytestmark = pytest.mark.skipif(not parallel_available,
+                                reason='parallel builds are not available')
+
+
+def build(srcdir, outdir, parallel, freshenv=True, **confoverrides):
+    """Build ``srcdir``, from scratch unless not ``freshenv``."""
+    warning = io.StringIO()
+    app = Sphinx(srcdir, srcdir, outdir, os.path.join(outdir, '.doctrees'),
+                 'html', confoverrides, status=None, warning=warning,
+                 freshenv=freshenv, parallel=parallel)
+    try:
+        app.build()
+    finally:
+        sphinx_autodoc_defaultargs.instrument.enabled = False
+        sphinx_autodoc_defaultargs.instrument.profiler = None
+        sphinx_autodoc_defaultargs.result_cache.enabled = False
+        sphinx_autodoc_defaultargs.result_cache.used = None
+    # E.g. extensions not declaring to be parallel safe
+    assert 'parallel' not in warning.getvalue()
+
+
+def module_pages(outdir, package):
+    return {path.name: path.read_text()
+            for path in pathlib.Path(outdir).glob(package + '.*.html')}
+
+
+def test_parallel_build(tmp_path):
+    # A package name of its own, as modules stay imported between tests
+    package = 'parallel_synthetic'
+    srcdir = corpus.write_project(
+        str(tmp_path), package=package, modules=6, functions=10,
+        n_params=6, doc_lines=3, style='google')
+
+    pages = {}
+    for parallel in [1, 4]:
+        outdir = str(tmp_path / '_build' / str(parallel))
+        # Readers of the parallel build start warm
+        build(srcdir, outdir, parallel,
+              docstring_default_arg_instrumentation=True,
+              docstring_default_arg_warmup=[package] if parallel > 1 else [])
+        pages[parallel] = module_pages(outdir, package)
+        report = (pathlib.Path(outdir) / 'defaultargs_report.json')
+        pages[parallel]['report'] = report.read_text()
+
+    assert len(pages[1]) == 7
+    assert 'Default' in pages[1][package + '.mod_0.html']
+    for name in pages[1]:
+        if name != 'report':
+            assert pages[4][name] == pages[1][name], name
+
+    # Records of all parallel readers are merged
+    reports = [json.loads(pages[p]['report']) for p in [1, 4]]
+    assert reports[0]['objects'] == reports[1]['objects'] > 6 * 10
+    assert reports[0]['documents'].keys() == reports[1]['documents'].keys()
+
+
+def test_parallel_build_caches(tmp_path):
+    package = 'parallel_caches'
+    srcdir = corpus.write_project(
+        str(tmp_path), package=package, modules=6, functions=3,
+        n_params=6, doc_lines=1, style='rest')
+    outdir = tmp_path / '_build'
+    build(srcdir, str(outdir), 4, docstring_default_arg_env_cache=True,
+          docstring_default_arg_persistent_cache=True)
+
+    # Results of all readers are kept
+    with open(str(outdir / '.doctrees' / 'environment.pickle'), 'rb') as f:
+        env = pickle.load(f)
+    modules = ['{}.mod_{}'.format(package, i) for i in range(6)]
+    assert sorted(env.defaultargs_documents) == ['index'] + modules
+    assert all(env.defaultargs_documents[docname] for docname in modules)
+    assert env.defaultargs_results
+    saved = json.loads(
+        (outdir / '.doctrees' / 'defaultargs_cache.json').read_text())
+    assert set(env.defaultargs_results) <= set(saved['entries'])
+
+    # A document read again starts with the results of the environment
+    path = pathlib.Path(srcdir) / (modules[0] + '.rst')
+    path.write_text(path.read_text() + '\nChanged.\n')
+    build(srcdir, str(outdir), 1, freshenv=False,
+          docstring_default_arg_env_cache=True)
+    result_cache = sphinx_autodoc_defaultargs.result_cache
+    assert (result_cache.hits, result_cache.misses) == (3, 0)
+
+    # The cache file, holding all results, is not used for a fresh
+    # environment
+    assert (outdir / '.doctrees' / 'defaultargs_cache.json').exists()
+    build(srcdir, str(outdir), 1,
+          docstring_default_arg_persistent_cache=True)
+    assert result_cache.misses > 0
@@ -1,16 +1,27 @@
 import functools
+import gc
 import itertools
+import json
 import pathlib
+import pstats
+import random
 import re
 import sys
 import textwrap
+import types
+import weakref
 
 import pytest
-from myclasses import MyCallable, MyIterable
+from myclasses import Derived, MyCallable, MyIterable, Outer
 from myclasses import __MyFunctor as MyFunctor
 
+import sphinx_autodoc_defaultargs
 from sphinx_autodoc_defaultargs import (
-    get_args, match_field, rfind_substring_in_paragraph, rstrip_min)
+    DefaultRenderer, DefaultSource, EditBuffer, FieldIndex, FlagMatcher,
+    IntrospectionCache, ResultCache, find_arg, get_args, instrument,
+    isstaticmethod, match_field, match_field_span, member_kinds, param_fields,
+    process_docstring, render_default, result_cache,
+    rfind_substring_in_paragraph, rstrip_min, type_fields)
 
 
 @pytest.mark.parametrize('encoding', ['utf-8'])
@@ -71,6 +82,37 @@ def test_match_field(encoding, args, result):
     assert match_field(lines, *args) == tuple(result)
 
 
+@pytest.mark.parametrize('include_blank', [False, True])
+def test_match_field_span(include_blank):
+    lines = textwrap.dedent("""\
+    Summary.
+
+    :param x: foo
+              bar
+
+              baz
+    :param y:
+    """).split('\n')
+    searchfor = [':param y:', ':param x:']
+
+    found, start, end, matched, span = match_field_span(
+        lines, searchfor, include_blank)
+    assert (found, start, matched, span.lines) == (True, 2, ':param x:', lines)
+    assert (found, start, end, matched, list(span)) == match_field(
+        lines, searchfor, include_blank)
+    assert span[0] == 'foo' and span[-1] == span[end - start - 1]
+    assert span[1:] == list(span)[1:]
+
+    # A single pass over iterators
+    result = match_field_span(iter(lines), searchfor, include_blank)
+    assert result[:4] == (found, start, end, matched)
+    assert list(result[4]) == list(span)
+
+    assert span.contains('bar') and not span.contains(':param')
+    assert span.contains('foo bar') and not span.contains('foobar')
+    assert not match_field_span(lines, ':param z:')[4]
+
+
 # The length of 'utf-16' bytearrays doubles from the normal ones
 @pytest.mark.parametrize('encoding', ['utf-8'])
 @pytest.mark.parametrize('string, min_len, result, default_result', [
@@ -132,15 +174,22 @@ def test_rfind_substring_in_paragraph(encoding, substr, strip, result):
     (0) {blank}
     ''').format(blank='\t\v').split('\n'))
 
+    # Only ' (' matches across lines, after the empty line before '(0)'
+    multiline_result = [True, False, (3, 0), (4, 1)] if (
+        substr, strip) == (' (', False) else result
+
     def test(tail):
         assert tuple(result) == rfind_substring_in_paragraph(
             lines, substr, strip)
+        assert tuple(multiline_result) == rfind_substring_in_paragraph(
+            lines, substr, strip, True)
 
-        new_result = result.copy()
-        if result[0]:
-            new_result[1] = result[1] and strip
-        assert tuple(new_result) == rfind_substring_in_paragraph(
-            lines + [tail], substr, strip)
+        for expected, multiline in [(result, False), (multiline_result, True)]:
+            new_result = expected.copy()
+            if expected[0]:
+                new_result[1] = expected[1] and strip
+            assert tuple(new_result) == rfind_substring_in_paragraph(
+                lines + [tail], substr, strip, multiline)
 
     test('\n')
 
@@ -150,6 +199,250 @@ def test_rfind_substring_in_paragraph(encoding, substr, strip, result):
     test('\n'.encode(encoding))
 
 
+@pytest.mark.parametrize('substr, strip, multiline_result', [
+    ('Defaults to', True, (True, False, (0, 5), (1, 6))),
+    ('. Defaults ', False, (True, False, (0, 3), (1, 0))),
+    ('.', True, (True, True, (1, 12), (1, 13))),
+    ('``1``.', False, (True, False, (1, 7), (1, 13))),
+])
+def test_rfind_substring_multiline(substr, strip, multiline_result):
+    lines = ['bar. Defaults', '    to ``1``.', '']
+    assert rfind_substring_in_paragraph(
+        lines, substr, strip, True) == multiline_result
+    assert rfind_substring_in_paragraph(
+        iter(lines), substr, strip, True) == multiline_result
+    assert rfind_substring_in_paragraph(lines, substr, strip)[0] == (
+        multiline_result[2][0] == multiline_result[3][0])
+
+
+def rfind_joined(lines, substr, strip):
+    """Reference of the multiline matching, searching all lines joined."""
+    if strip:
+        substr = substr.strip()
+    pieces = [line.strip() if strip else line for line in lines]
+    leads = [len(line) - len(line.lstrip()) if strip else 0 for line in lines]
+    joined = ' '.join(pieces)
+    idx = joined.rfind(substr) if lines else -1
+    if idx < 0:
+        return False, None, None, None
+    starts = list(itertools.accumulate([0] + [len(p) + 1 for p in pieces]))
+
+    def position(idx):
+        i = max(i for i, start in enumerate(starts[:-1]) if start <= idx)
+        return i, idx - starts[i] + leads[i]
+
+    rest = joined[idx + len(substr):]
+    return (True, not (rest.strip() if strip else rest),
+            position(idx), position(idx + len(substr)))
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_rfind_substring_multiline_random(seed):
+    rng = random.Random(seed)
+    lines = [''.join(rng.choice('ab ') for _ in range(rng.randrange(5)))
+             for _ in range(rng.randrange(6))]
+    for _ in range(10):
+        substr = ''.join(rng.choice('ab ') for _ in range(rng.randint(1, 4)))
+        for strip in [False, True]:
+            if strip and not substr.strip():
+                continue
+            expected = rfind_joined(lines, substr, strip)
+            assert rfind_substring_in_paragraph(
+                lines, substr, strip, True) == expected
+
+
+def find_flags(lines, flags, strip, multiline):
+    """Reference of :class:`FlagMatcher`, trying each pair in order."""
+    for head, tail in flags:
+        tail_found, is_end, t_start = rfind_substring_in_paragraph(
+            lines, tail, strip, multiline)[:3]
+        if tail_found and is_end:
+            head_found, _, h_start, h_end = rfind_substring_in_paragraph(
+                lines, head, strip, multiline)
+            if head_found:
+                return h_start, h_end, t_start
+    return None
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_flag_matcher(seed):
+    rng = random.Random(seed)
+    chars = 'ab() '
+    flags = [('(a ', ')'), ('b', 'a'), ('(', 'a)'),
+             ('a b', ') '), (' b', 'b ')]
+    for _ in range(20):
+        lines = [''.join(rng.choice(chars) for _ in range(rng.randrange(6)))
+                 for _ in range(rng.randrange(5))]
+        order = rng.sample(flags, rng.randint(1, len(flags)))
+        for strip, multiline in itertools.product([False, True], repeat=2):
+            matcher = FlagMatcher(order, strip, multiline)
+            assert matcher(lines) == find_flags(lines, order, strip, multiline)
+
+
+def test_multiline_flags():
+    app = ConfigApp(docstring_default_arg_flags_multiline_matching=True,
+                    docstring_default_arg_flags=[('(Default: ', ')'),
+                                                 ('Defaults to ', '.')])
+
+    def func(x=1, y=2):
+        pass
+
+    lines = [':param x: foo (Default:', '          ``1``)',
+             ':param y: bar. Defaults', '          to ``2``.']
+    process_docstring(app, 'function', 'func', func, None, lines)
+    assert lines == [':type x: optional', ':param x: foo',
+                     '          |default| ``1``',
+                     ':type y: optional', ':param y: bar.',
+                     '          |default| ``2``']
+
+
+FIELD_INDEX_LINES = textwrap.dedent(r"""
+    Summary.
+
+    :param x: foo
+              bar
+    :type x: int
+    :keyword y\_: baz
+
+    .. note:: qux
+
+       quux
+    :returns: 0
+    :param \*\*kwargs: kw
+    :rtype: int
+    """).split('\n')
+FIELD_INDEX_ARGS = ['x', 'z', r'y\_', r'\*\*kwargs']
+
+
+def check_field_index(index, lines):
+    assert index.lines is lines
+    all_fields = [param_fields, type_fields]
+    for arg, names in itertools.product(FIELD_INDEX_ARGS + ['w'], all_fields):
+        searchfor = [':{} {}:'.format(name, arg) for name in names]
+        for include_blank in [False, True]:
+            field = index.find(names, arg)
+            result = match_field(lines, searchfor, include_blank)
+            if field is None:
+                assert not result[0]
+            else:
+                assert result == (
+                    True, index.start(field), index.end(field, include_blank),
+                    field.matched, index.text(field, include_blank))
+    for arg, incr in itertools.product(FIELD_INDEX_ARGS, [0, 1]):
+        assert index.find_arg(FIELD_INDEX_ARGS, arg, incr) == find_arg(
+            lines, FIELD_INDEX_ARGS, arg, incr)
+    # The pattern of each argument is compiled once
+    assert sphinx_autodoc_defaultargs.arg_pattern.cache_info().hits
+
+
+def field_spans(index):
+    return [(index.start(f), index.end(f), index.end(f, True))
+            for f in index.fields]
+
+
+@pytest.mark.parametrize('edits', [
+    [],
+    [('insert', 5, ':param z: new')],
+    [('insert', 4, '          more'), ('insert', 0, ':type z: str')],
+    [('insert', 8, ''), ('insert', 9, '   text')],
+    [('delete', 7, 12), ('replace', 3, ':param x: foo')],
+    [('replace', 5, ':type z: int'), ('delete', 0, 3)],
+    [('replace', 12, '   :returns: 1'), ('insert', 15, ':raises ValueError: x')],
+])
+def test_field_index(edits):
+    lines = list(FIELD_INDEX_LINES)
+    index = FieldIndex(lines)
+    check_field_index(index, lines)
+    buffer = EditBuffer(list(FIELD_INDEX_LINES))
+    buffered_index = FieldIndex(buffer)
+    for edit, *args in edits:
+        getattr(index, edit)(*args)
+        check_field_index(index, lines)
+        check_field_index(FieldIndex(lines), lines)
+        getattr(buffered_index, edit)(*args)
+        assert field_spans(buffered_index) == field_spans(index)
+    buffer.apply()
+    assert buffer.lines == lines
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_field_index_random_edits(seed):
+    rng = random.Random(seed)
+    pool = FIELD_INDEX_LINES + [
+        '', '   more', ':param z: new', ':kwtype y\\_: str']
+    lines = list(FIELD_INDEX_LINES)
+    index = FieldIndex(EditBuffer(list(lines)))
+    for _ in range(30):
+        op = rng.choice(['insert', 'delete', 'replace'])
+        if op == 'insert':
+            args = rng.randint(0, len(lines)), rng.choice(pool)
+            lines.insert(*args)
+        elif not lines:
+            continue
+        elif op == 'delete':
+            start = rng.randrange(len(lines))
+            args = start, rng.randint(start, min(start + 3, len(lines)))
+            del lines[slice(*args)]
+        else:
+            args = rng.randrange(len(lines)), rng.choice(pool)
+            lines[args[0]] = args[1]
+        getattr(index, op)(*args)
+        assert list(index.lines) == lines
+        assert field_spans(index) == field_spans(FieldIndex(lines))
+        for arg, incr in itertools.product(FIELD_INDEX_ARGS, [0, 1]):
+            assert index.find_arg(FIELD_INDEX_ARGS, arg, incr) == find_arg(
+                lines, FIELD_INDEX_ARGS, arg, incr)
+
+
+def replay(lines, plan):
+    result, pos = [], 0
+    for op, idx, arg in plan:
+        result.extend(lines[pos:idx])
+        if op == 'delete':
+            pos = arg
+        elif op == 'replace':
+            result.append(arg)
+            pos = idx + 1
+        else:
+            result.extend(arg)
+            pos = idx
+    return result + lines[pos:]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_edit_buffer(seed):
+    rng = random.Random(seed)
+    original = [str(i) for i in range(rng.randrange(10))]
+    expected = list(original)
+    buffer = EditBuffer(list(original))
+    for i in range(30):
+        op = rng.choice(['insert', 'delete', 'replace'])
+        if op == 'insert':
+            idx = rng.randint(0, len(expected))
+            expected.insert(idx, 'i{}'.format(i))
+            buffer.insert(idx, 'i{}'.format(i))
+        elif not expected:
+            continue
+        elif op == 'delete':
+            start = rng.randrange(len(expected))
+            stop = rng.randint(start, len(expected))
+            del expected[start:stop]
+            del buffer[start:stop]
+        else:
+            idx = rng.randrange(len(expected))
+            expected[idx] = buffer[idx] + 'r{}'.format(i)
+            buffer[idx] = expected[idx]
+        assert len(buffer) == len(expected)
+        assert list(buffer) == expected
+        assert [buffer[i] for i in range(len(buffer))] == expected
+        assert buffer.lines == original
+        assert replay(original, buffer.plan()) == expected
+
+    buffer.apply()
+    assert buffer.lines == expected
+    assert buffer.plan() == []
+
+
 def my_func(*, y, **kwargs_):
     pass
 
@@ -184,6 +477,1133 @@ def test_get_args(func, for_sphinx, result):
     assert get_args(MyCallable(func)) == [r'\*args', r'\*\*kwargs']
 
 
+def test_introspection_cache():
+    cache = IntrospectionCache(maxsize=2)
+
+    def func(x, y_=0, *, z=None):
+        pass
+
+    info = cache(func)
+    assert cache(func) is info
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert info.args == ['x', r'y\_', 'z']
+    assert list(info.default_args.items()) == [
+        (r'y\_', (0, False)), ('z', (None, True))]
+    assert info.signature is info.unwrapped_signature
+    assert not info.is_static
+
+    partial = functools.partial(func, 1)
+    assert cache(partial).args == info.args
+    assert list(cache(partial).signature.parameters) == ['y_', 'z']
+    assert len(cache) == 2
+
+    # least recently used
+    other = my_func
+    cache(other)
+    assert len(cache) == 2
+    assert cache(func) is not info
+    assert cache.hits == 2
+
+    # weakly referenced
+    del func, partial
+    gc.collect()
+    assert len(cache) == 1
+
+    # not weakly referenceable
+    cache(str.join)
+    assert len(cache) == 1
+    assert cache(str.join) is not cache(str.join)
+    cache.clear()
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+
+@pytest.mark.parametrize('func, result', [
+    (my_func, False),
+    (Outer.Inner.static, True),
+    (Outer.Inner.cls, False),
+    (Outer.Inner.method, False),
+    (Outer.Inner._Inner__private, True),
+    (Derived.static, False),
+    (MyFunctor._staticmethod, True),
+    (MyFunctor._MyFunctor__staticmethod, True),
+    (MyFunctor._classmethod, False),
+    (functools.partial(Outer.Inner.static, 1), True),
+])
+def test_isstaticmethod(func, result):
+    assert isstaticmethod(func) == result
+
+
+def test_member_kinds():
+    kinds = member_kinds(Derived)
+    assert member_kinds(Derived) is kinds
+    names = ['static', 'cls', 'method', '_Inner__private']
+    assert [kinds[name] for name in names] == [
+        'instance', 'class', 'instance', 'static']
+    assert member_kinds(Outer.Inner)['static'] == 'static'
+
+
+class ConfigApp(object):
+    """Just enough of Sphinx to call the event handlers."""
+
+    def __init__(self, **config):
+        self.config = types.SimpleNamespace()
+        sphinx_autodoc_defaultargs.setup(self)
+        vars(self.config).update(config)
+
+    def add_config_value(self, name, default, rebuild):
+        setattr(self.config, name, default)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class Sentinel(object):
+    def __repr__(self):
+        return '<sentinel>'
+
+
+def test_default_renderer():
+    sentinel = Sentinel()
+    calls = []
+    renderer = DefaultRenderer(max_length=10, maxsize=1)
+    renderer.register(
+        Sentinel, lambda value: calls.append(value) or 'SENTINEL')
+    renderer.register('builtins.int', '<{}>'.format)
+
+    assert renderer(sentinel) == renderer(sentinel) == 'SENTINEL'
+    assert calls == [sentinel]
+    assert renderer(True) == '<True>'  # bool is a subclass of int
+    assert renderer(0.5) == '0.5'
+    assert renderer(sentinel) == 'SENTINEL' and len(calls) == 2
+    assert renderer('x' * 20) == "'xxxxxx..."
+    assert renderer(list(range(100))) == '[0, 1, ...'
+    assert renderer({3: 0, 1: 0}) == '{1: 0, ...'
+    assert DefaultRenderer()({3: 0, 1: 0}) == '{1: 0, 3: 0}'
+    assert DefaultRenderer()(list(range(100))) == repr(list(range(100)))
+
+
+def test_defaults_held_weakly():
+    app = ConfigApp(always_document_default_args=True)
+
+    def make_function():
+        def func(x=Sentinel(), y=[]):
+            pass
+        return func
+
+    func = make_function()
+    defaults = weakref.ref(func.__defaults__[0])
+    lines = []
+    process_docstring(app, 'function', 'func', func, None, lines)
+    assert lines[-1] == ':param y: |default| :code:`[]`'
+
+    # The signatures are computed again once dropped
+    info = sphinx_autodoc_defaultargs.introspect(func)
+    signature = info.signature
+    info.compact()
+    assert info.signature is not signature
+    assert info.signature == signature
+
+    del func, info, signature
+    gc.collect()
+    assert defaults() is None
+
+
+def test_lazy_default_rendering():
+    calls = []
+    app = ConfigApp()
+
+    def func(x=Sentinel(), y=Sentinel(), z=Sentinel()):
+        pass
+
+    render_default.register(Sentinel, lambda value: calls.append(value) or 'S')
+    try:
+        lines = [':param x: foo', ':param y: bar (Default: ``y``)']
+        process_docstring(app, 'function', 'func', func, None, lines)
+        assert lines == [':type x: optional', ':param x: foo',
+                         '          |default| :code:`S`',
+                         ':type y: optional', ':param y: bar',
+                         '          |default| ``y``']
+        assert calls == [func.__defaults__[0]]
+    finally:
+        del render_default.renderers[Sentinel]
+        render_default.clear()
+
+
+SOURCE = textwrap.dedent('''\
+    import functools
+
+    CONSTANT = 1
+
+
+    def func(a, b=CONSTANT  +  1, *args, c=(1,
+                                          2), d, **kwargs):
+        pass
+
+
+    def decorated(x=None):
+        pass
+
+
+    @functools.wraps(decorated)
+    def decorated(x=[]):
+        pass
+
+
+    class Class(object):
+        def method(self, x={'a': 1}):
+            pass
+
+        @staticmethod
+        def static(x=CONSTANT):
+            def local(y=x):
+                pass
+            return local
+    ''')
+
+
+def test_source_signatures(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    path = tmp_path / 'source_signatures_module.py'
+    path.write_text(SOURCE)
+    module = __import__(path.stem)
+    signatures = sphinx_autodoc_defaultargs.SourceSignatures(maxsize=1)
+
+    signature = signatures.signature(module.func)
+    assert str(signature) == (
+        '(a, b=CONSTANT  +  1, *args, c=(1, 2), d, **kwargs)')
+    assert isinstance(signature.parameters['b'].default, DefaultSource)
+    # Both definitions have the same name
+    assert str(signatures.signature(module.decorated)) == '(x=[])'
+    assert str(signatures.signature(module.Class.method)) == (
+        "(self, x={'a': 1})")
+    assert str(signatures.signature(module.Class().method)) == (
+        "(x={'a': 1})")
+    assert str(signatures.signature(module.Class.static())) == '(y=x)'
+    assert signatures.signature(len) is None
+    assert signatures.signature(functools.partial(module.func, 0)) is None
+    assert len(signatures) == 1
+
+    functions = signatures.functions(str(path))
+    assert signatures.functions(str(path)) is functions
+    path.write_text(SOURCE.replace('def func(a,', 'def func(renamed,'))
+    assert signatures.functions(str(path)) is not functions
+    # Not what was imported anymore
+    assert signatures.signature(module.func) is None
+    assert signatures.functions(str(tmp_path / 'missing.py')) == {}
+    assert len(signatures) == 1
+
+
+def test_process_docstring_source_defaults(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    path = tmp_path / 'source_defaults_module.py'
+    path.write_text(SOURCE)
+    module = __import__(path.stem)
+    app = ConfigApp(docstring_default_arg_source_defaults=True)
+    sphinx_autodoc_defaultargs.init_caches(app, app.config)
+    try:
+        lines = [':param b: foo']
+        process_docstring(app, 'function', 'func', module.func, None, lines)
+        assert lines == [':type b: optional', ':param b: foo',
+                         '          |default| :code:`CONSTANT  +  1`']
+        lines = [':param x: foo']
+        process_docstring(app, 'method', 'Class.method', module.Class.method,
+                          None, lines)
+        assert lines[-1] == "          |default| :code:`{'a': 1}`"
+    finally:
+        app.config.docstring_default_arg_source_defaults = False
+        sphinx_autodoc_defaultargs.init_caches(app, app.config)
+
+    lines = [':param b: foo']
+    process_docstring(app, 'function', 'func', module.func, None, lines)
+    assert lines[-1] == '          |default| :code:`2`'
+
+
+class ExtensionCallable(object):
+    """extension(a, b=1, *, c=None) -> None
+
+    Like a callable of an extension module, ``__signature__``
+    is not supported by :func:`inspect.signature`.
+    """
+
+    __name__ = 'extension'
+    __signature__ = 'unsupported'
+
+    def __init__(self, text_signature=None):
+        self.__text_signature__ = text_signature
+
+    def __call__(self, *args, **kwargs):
+        pass
+
+
+@pytest.mark.parametrize('obj, signature', [
+    (ExtensionCallable('($self, a, /, b=(1, 2))'),
+     '(self, a, /, b=(1, 2))'),
+    (ExtensionCallable('(a, b=<unrepresentable>)'), '(a, b=1, *, c=None)'),
+    (ExtensionCallable(), '(a, b=1, *, c=None)'),
+    (print, "(*args, sep=' ', end='\\n', file=None, flush=False)"),
+    (dict.get, '(self, key, default=None, /)'),
+    ({}.get, '(key, default=None, /)'),
+    (iter, '(iterable)'),
+    (getattr, None),
+])
+def test_fallback_signature(obj, signature):
+    result = sphinx_autodoc_defaultargs.fallback_signature(obj)
+    assert (result if result is None else str(result)) == signature
+
+
+def test_process_docstring_fallback_signature():
+    app = ConfigApp()
+    lines = [':param b: foo']
+    process_docstring(app, 'function', 'extension',
+                      ExtensionCallable('(a, b=<unrepresentable>)'), None,
+                      lines)
+    assert lines == [':type b: optional', ':param b: foo',
+                     '          |default| :code:`1`']
+
+
+def test_no_signature(monkeypatch):
+    no_signature = sphinx_autodoc_defaultargs.no_signature
+    app = ConfigApp()
+    app.env = env = types.SimpleNamespace()
+    sphinx_autodoc_defaultargs.init_no_signature(app)
+    signature = sphinx_autodoc_defaultargs.Signature
+    calls = []
+    monkeypatch.setattr(sphinx_autodoc_defaultargs, 'Signature',
+                        lambda obj: calls.append(obj) or signature(obj))
+    sphinx_autodoc_defaultargs.introspect.clear()
+
+    assert no_signature.name(getattr) == 'builtins.getattr'
+    assert no_signature.name(dict.get) == 'builtins.dict.get'
+    assert no_signature.name(lambda: None) is None
+    for _ in range(3):
+        lines = [':param default: foo']
+        process_docstring(app, 'function', 'getattr', getattr, None, lines)
+        assert lines == [':param default: foo']
+    # Skipped once known to have no signature
+    assert calls == [getattr] and no_signature.hits == 2
+    assert env.defaultargs_no_signature == {
+        'builtins.getattr': no_signature.fingerprint(getattr)}
+    with pytest.raises(ValueError):
+        get_args(getattr)
+    assert calls == [getattr]
+
+    # Names found by parallel readers, and kept for the next build
+    other = types.SimpleNamespace(defaultargs_no_signature={
+        'builtins.min': no_signature.fingerprint(min)})
+    sphinx_autodoc_defaultargs.merge_no_signature(app, env, [], other)
+    sphinx_autodoc_defaultargs.init_no_signature(app)
+    assert len(no_signature) == 2 and min in no_signature
+    process_docstring(app, 'function', 'min', min, None, [])
+    assert calls == [getattr]
+
+    # Not another object of the same name, e.g. with a signature now
+    def func(default=None):
+        """Without a text signature."""
+
+    func.__module__, func.__qualname__ = 'builtins', 'getattr'
+    assert no_signature.name(func) == 'builtins.getattr'
+    assert func not in no_signature
+    lines = [':param default: foo']
+    process_docstring(app, 'function', 'getattr', func, None, lines)
+    assert lines[-1].endswith(' |default| :code:`None`')
+    # Nor of another version of the extension
+    env.defaultargs_no_signature['builtins.min'] = 'other'
+    assert min not in no_signature
+
+    app.env = types.SimpleNamespace()
+    sphinx_autodoc_defaultargs.init_no_signature(app)
+    assert len(no_signature) == 0 and getattr not in no_signature
+
+
+def test_result_cache(tmp_path):
+    cache = ResultCache(maxsize=2)
+    cache.put('a', ['1'])
+    cache.put('b', ['2'])
+    assert cache.get('a') == ['1']
+    cache.put('c', ['3'])
+    assert cache.get('b') is None
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 2)
+
+    path = str(tmp_path / 'cache.json')
+    cache.save(path)
+    loaded = ResultCache(maxsize=1)
+    loaded.load(path)
+    assert (len(loaded), loaded.get('c'), loaded.get('a')) == (1, ['3'], None)
+    (tmp_path / 'cache.json').write_text('{')
+    loaded.load(path)
+    assert len(loaded) == 0
+
+    # Written by another version of the extension
+    data = json.dumps({'version': ResultCache.version, 'code': 'other',
+                       'entries': {'c': ['3']}})
+    (tmp_path / 'cache.json').write_text(data)
+    loaded.load(path)
+    assert len(loaded) == 0
+    (tmp_path / 'cache.json').write_text(data.replace(
+        'other', sphinx_autodoc_defaultargs.code_digest()))
+    loaded.load(path)
+    assert len(loaded) == 1
+
+
+def test_process_docstring_result_cache():
+    app = ConfigApp(docstring_default_arg_persistent_cache=True)
+    sphinx_autodoc_defaultargs.init_caches(app, app.config)
+
+    def func(x=0):
+        pass
+
+    try:
+        result_cache.clear()
+        results = []
+        for _ in range(2):
+            # Not remembered in memory, as in a new build
+            sphinx_autodoc_defaultargs.introspect.clear()
+            lines = [':param x: foo']
+            process_docstring(app, 'function', 'func', func, None, lines)
+            results.append(lines)
+        assert results[0] == results[1] == [':type x: optional',
+                                            ':param x: foo',
+                                            '          |default| :code:`0`']
+        assert (result_cache.hits, result_cache.misses) == (1, 1)
+
+        app.config.docstring_default_arg_substitution = '|d|'
+        lines = [':param x: foo']
+        process_docstring(app, 'function', 'func', func, None, lines)
+        assert lines[-1] == '          |d| :code:`0`'
+    finally:
+        result_cache.enabled = False
+        result_cache.clear()
+
+
+def test_process_docstring_reuse(monkeypatch):
+    app = ConfigApp()
+    calls = []
+    process_lines = sphinx_autodoc_defaultargs.process_lines
+    monkeypatch.setattr(sphinx_autodoc_defaultargs, 'process_lines',
+                        lambda *args: calls.append(args) or process_lines(
+                            *args))
+
+    class Base(object):
+        def __init__(self, x=0):
+            pass
+
+    subclasses = [type('Sub{}'.format(i), (Base,), {}) for i in range(3)]
+    results = []
+    for cls in subclasses:
+        lines = [':param x: foo']
+        process_docstring(app, 'class', cls.__name__, cls, None, lines)
+        results.append(lines)
+    assert results[0] == results[1] == results[2] == [
+        ':type x: optional', ':param x: foo', '          |default| :code:`0`']
+    assert len(calls) == 1
+
+    # Other input lines, context or config
+    process_docstring(app, 'class', 'Sub0', subclasses[0], None, [])
+    process_docstring(app, 'function', 'Base.__init__', Base.__init__,
+                      None, [':param x: foo'])
+    app.config.docstring_default_arg_substitution = '|d|'
+    lines = [':param x: foo']
+    process_docstring(app, 'class', 'Sub0', subclasses[0], None, lines)
+    assert lines[-1] == '          |d| :code:`0`'
+    assert len(calls) == 4
+
+    # Processed lines are copied
+    lines[0] = 'changed'
+    lines = [':param x: foo']
+    process_docstring(app, 'class', 'Sub1', subclasses[1], None, lines)
+    assert lines[0] == ':type x: optional' and len(calls) == 4
+
+    # Classmethods, bound anew to each subclass
+    class Mixin(object):
+        @classmethod
+        def make(cls, y=1):
+            pass
+
+    results = []
+    for cls in [type('A', (Mixin,), {}), type('B', (Mixin,), {})]:
+        lines = [':param y: bar']
+        process_docstring(app, 'method', cls.__name__ + '.make', cls.make,
+                          None, lines)
+        results.append(lines)
+    assert results[0] == results[1] == [
+        ':type y: optional', ':param y: bar', '          |d| :code:`1`']
+    assert len(calls) == 5
+
+
+def template_function(x, y, z, w):
+    def func(a, x=x, y=y, *, z=z, w=w):
+        pass
+    return func
+
+
+@pytest.mark.parametrize('always_document_default_args', [False, True])
+@pytest.mark.parametrize('after_directives', [False, True])
+def test_process_docstring_plan_cache(always_document_default_args,
+                                      after_directives):
+    app = ConfigApp(
+        always_document_default_args=always_document_default_args,
+        docstring_default_arg_after_directives=after_directives)
+    plan_cache = sphinx_autodoc_defaultargs.plan_cache
+    funcs = [template_function(1, 'y', None, ()),
+             template_function(2.5, {'key': 'y'}, 'z', frozenset()),
+             template_function('\x00', '', 0, [1])]
+    template = [
+        'Summary of {}.', '', ':param a: The {}.',
+        ':param x: The x. (Default: 1)', ':type x: int',
+        ':param y: The y.', '', '   .. note:: Nothing.', '',
+        ':keyword z: The z.', ':rtype: None']
+
+    def process(func, i, cache_size):
+        sphinx_autodoc_defaultargs.introspect.clear()
+        plan_cache.maxsize = cache_size
+        lines = [line.format(i, i) for line in template]
+        process_docstring(app, 'function', 'func', func, None, lines)
+        return lines
+
+    try:
+        plan_cache.clear()
+        for i, func in enumerate(funcs):
+            assert process(func, i, 1024) == process(func, i, 0)
+        assert (plan_cache.hits, plan_cache.misses) == (2, 1)
+        assert len(plan_cache) == 1
+
+        # Placeholders in the docstring are not cached
+        template[0] = 'Summary\x00'
+        assert process(funcs[0], 0, 1024) == process(funcs[0], 0, 0)
+        assert (plan_cache.hits, plan_cache.misses) == (2, 1)
+    finally:
+        plan_cache.maxsize = 1024
+        plan_cache.clear()
+
+
+class CountingConfig(types.SimpleNamespace):
+    """Counts the values read, like the defaults of a Sphinx config
+    read through ``Config.__getattr__``."""
+
+    def __getattribute__(self, name):
+        if name.startswith(('always_', 'docstring_')):
+            vars(self)['reads'] += 1
+        return super().__getattribute__(name)
+
+
+def test_compiled_config():
+    app = ConfigApp(always_document_default_args=True)
+    app.config = CountingConfig(reads=0, **vars(app.config))
+    sphinx_autodoc_defaultargs.init_caches(app, app.config)
+    compiled = sphinx_autodoc_defaultargs.compiled_config(app.config)
+    assert compiled.default_prefix == ' |default| '
+
+    def func(x=0, y=1):
+        pass
+
+    reads = vars(app.config)['reads']
+    lines = [':param x: foo']
+    process_docstring(app, 'function', 'func', func, None, lines)
+    assert lines == [':type x: optional', ':param x: foo',
+                     '          |default| :code:`0`',
+                     ':type y: optional', ':param y: |default| :code:`1`']
+    # No value is read per docstring
+    assert vars(app.config)['reads'] == reads
+    assert sphinx_autodoc_defaultargs.compiled_config(app.config) is compiled
+
+    # Compiled again once a value is changed
+    app.config.docstring_default_arg_substitution = '|d|'
+    compiled = sphinx_autodoc_defaultargs.compiled_config(app.config)
+    assert compiled.stub_suffix == ': |d| '
+    lines = [':param x: foo']
+    process_docstring(app, 'function', 'func', func, None, lines)
+    assert lines[2] == '          |d| :code:`0`'
+
+
+def test_env_results():
+    app = ConfigApp(docstring_default_arg_env_cache=True)
+    app.env = env = types.SimpleNamespace(docname='a')
+    sphinx_autodoc_defaultargs.init_caches(app, app.config)
+    sphinx_autodoc_defaultargs.init_env_cache(app)
+
+    def func(x=0):
+        pass
+
+    try:
+        sphinx_autodoc_defaultargs.load_result_cache(app)
+        sphinx_autodoc_defaultargs.introspect.clear()
+        lines = [':param x: foo']
+        process_docstring(app, 'function', 'func', func, None, lines)
+        sphinx_autodoc_defaultargs.record_results(app, None)
+        [key] = env.defaultargs_documents['a']
+        assert env.defaultargs_results == {key: '\n'.join(lines) + '\n'}
+        assert result_cache.used == {}
+
+        # Reused for the same callable, still recorded for the document
+        env.docname = 'e'
+        lines = [':param x: foo']
+        process_docstring(app, 'function', 'func', func, None, lines)
+        assert sphinx_autodoc_defaultargs.introspect.hits
+        sphinx_autodoc_defaultargs.record_results(app, None)
+        assert env.defaultargs_documents['e'] == [key]
+        del env.defaultargs_documents['e']
+        env.docname = 'a'
+
+        # Read by another process
+        other = types.SimpleNamespace(
+            defaultargs_documents={'b': [key, 'k'], 'c': ['l']},
+            defaultargs_results={key: 'old\n', 'k': '\n', 'l': ''})
+        sphinx_autodoc_defaultargs.merge_results(app, env, ['b'], other)
+        assert env.defaultargs_documents == {'a': [key], 'b': [key, 'k']}
+        assert env.defaultargs_results[key] != 'old\n'
+        assert env.defaultargs_results['k'] == '\n'
+        assert result_cache.get('k') == [''] and len(result_cache) == 2
+
+        sphinx_autodoc_defaultargs.purge_results(app, env, 'a')
+        sphinx_autodoc_defaultargs.purge_results(app, env, 'b')
+        env.defaultargs_documents['d'] = ['k']
+        sphinx_autodoc_defaultargs.prune_results(app, env)
+        assert env.defaultargs_results == {'k': '\n'}
+
+        # The next build starts with the results of the environment
+        sphinx_autodoc_defaultargs.load_result_cache(app)
+        assert len(result_cache) == 1 and result_cache.get('k') == ['']
+        assert ResultCache.decode(ResultCache.encode([])) == []
+    finally:
+        result_cache.enabled = False
+        result_cache.used = None
+        result_cache.clear()
+
+
+class IndexedBase(object):
+    def __init__(self, x=1):
+        pass
+
+    def method(self, a, b=(1, 2), *args, c=None, **kwargs):
+        pass
+
+    @classmethod
+    def make(cls, size=3, color='red'):
+        pass
+
+
+class IndexedSub(IndexedBase):
+    @staticmethod
+    def static(y=0):
+        pass
+
+
+def test_default_arg_index(tmp_path):
+    app = ConfigApp(docstring_default_arg_index=True, project='Project',
+                    release='1.0')
+    app.outdir = str(tmp_path)
+    app.env = env = types.SimpleNamespace(docname='a')
+    sphinx_autodoc_defaultargs.init_index(app)
+    upstream = 'test_sphinx_autodoc_defaultargs.'
+    for what, name, obj in [
+            ('class', 'up.IndexedBase', IndexedBase),
+            ('method', 'up.IndexedBase.method', IndexedBase.method),
+            ('method', 'up.IndexedBase.make', IndexedBase.make),
+            ('function', 'up.func', lambda: None)]:
+        process_docstring(app, what, name, obj, None, [])
+    assert env.defaultargs_index == {'a': {
+        'up.IndexedBase': {
+            'what': 'class', 'bases': [],
+            'defined': upstream + 'IndexedBase',
+            'params': [['x', 'POSITIONAL_OR_KEYWORD', '1']]},
+        'up.IndexedBase.method': {
+            'what': 'method',
+            'params': [['a', 'POSITIONAL_OR_KEYWORD', None],
+                       ['b', 'POSITIONAL_OR_KEYWORD', '(1, 2)'],
+                       ['args', 'VAR_POSITIONAL', None],
+                       ['c', 'KEYWORD_ONLY', 'None'],
+                       ['kwargs', 'VAR_KEYWORD', None]]},
+        'up.IndexedBase.make': {
+            'what': 'method',
+            'params': [['size', 'POSITIONAL_OR_KEYWORD', '3'],
+                       ['color', 'POSITIONAL_OR_KEYWORD', "'red'"]]}}}
+
+    # Documents read by another process, or again
+    other = types.SimpleNamespace(defaultargs_index={
+        'b': {'down.IndexedSub': {}}, 'c': {}})
+    sphinx_autodoc_defaultargs.merge_index(app, env, ['b'], other)
+    assert sorted(env.defaultargs_index) == ['a', 'b']
+    sphinx_autodoc_defaultargs.purge_index(app, env, 'b')
+    sphinx_autodoc_defaultargs.write_index(app, None)
+    index = sphinx_autodoc_defaultargs.DefaultArgsIndex.load(
+        str(tmp_path / 'defaultargs.inv'))
+    assert (index.project, index.release, len(index)) == (
+        'Project', '1.0', 3)
+
+    # Another project documenting a subclass
+    env.defaultargs_index = {}
+    env.docname = 'b'
+    for what, name, obj in [
+            ('class', 'down.IndexedSub', IndexedSub),
+            ('method', 'down.IndexedSub.static', IndexedSub.static)]:
+        process_docstring(app, what, name, obj, None, [])
+    sub = sphinx_autodoc_defaultargs.DefaultArgsIndex(
+        env.defaultargs_index['b'])
+    assert sub.defaults('down.IndexedSub.static') == {'y': '0'}
+    assert sub.find('down.IndexedSub.method') is None
+    sub.update(index)
+    assert sub.defaults('down.IndexedSub.method') == {'b': '(1, 2)',
+                                                      'c': 'None'}
+    assert sub.parameters('down.IndexedSub')[0] == (
+        'x', 'POSITIONAL_OR_KEYWORD', '1')
+    assert 'down.IndexedSub.missing' not in sub
+    with pytest.raises(ValueError):
+        sphinx_autodoc_defaultargs.DefaultArgsIndex.loads(b'objects.inv')
+
+
+@pytest.mark.parametrize('lines, span', [
+    ([], (0, 0)),
+    (['Summary.', '', 'Text.'], (3, 3)),
+    (['Summary.', ':param x: a', '  b', '', ':rtype: int', '', 'End.'],
+     (1, 6)),
+    ([':param x: a', '', '  b'], (0, 3)),
+])
+def test_field_list_span(lines, span):
+    assert sphinx_autodoc_defaultargs.field_list_span(lines) == span
+
+
+def test_budgets(monkeypatch):
+    app = ConfigApp(docstring_default_arg_max_lines=10)
+    app.env = env = types.SimpleNamespace(docname='doc')
+    sphinx_autodoc_defaultargs.init_budgets(app)
+    warnings = []
+    monkeypatch.setattr(sphinx_autodoc_defaultargs.logger, 'warning',
+                        lambda message, *args: warnings.append(message % args))
+
+    def func(x=0, y=1):
+        pass
+
+    def process(**config):
+        sphinx_autodoc_defaultargs.introspect.clear()
+        vars(app.config).update(config)
+        lines = ['Summary.'] + ['Text.'] * 20 + [':param x: foo', '', 'End.']
+        process_docstring(app, 'function', 'func', func, None, lines)
+        return lines
+
+    # Only the field list is processed
+    assert process() == ['Summary.'] + ['Text.'] * 20 + [
+        ':type x: optional', ':param x: foo', '          |default| :code:`0`',
+        '', 'End.']
+    [(name, what, message)] = env.defaultargs_budgets.pop('doc')
+    assert (name, what) == ('func', 'function')
+    assert message == ('24 lines exceeding docstring_default_arg_max_lines '
+                       '= 10, only the field list processed')
+    assert not warnings
+
+    # Left as is
+    lines = ['Summary.'] + ['Text.'] * 20 + [':param x: foo', '', 'End.']
+    for config, message in [
+            ({'docstring_default_arg_max_lines': 1},
+             '2 lines exceeding docstring_default_arg_max_lines = 1'),
+            ({'docstring_default_arg_max_lines': None,
+              'docstring_default_arg_max_params': 1},
+             '2 default arguments exceeding '
+             'docstring_default_arg_max_params = 1'),
+            ({'docstring_default_arg_max_params': None,
+              'docstring_default_arg_time_limit': -1},
+             'processing time exceeding '
+             'docstring_default_arg_time_limit = -1')]:
+        assert process(**config) == lines
+        assert warnings.pop() == ('sphinx_autodoc_defaultargs: default '
+                                  'arguments of func not documented, ' +
+                                  message)
+        assert env.defaultargs_budgets.pop('doc') == [
+            ('func', 'function', message)]
+
+    # Reported again when the result is reused
+    lines = ['Summary.'] + ['Text.'] * 20 + [':param x: foo', '', 'End.']
+    for name in ['func', 'alias']:
+        process_docstring(app, 'function', name, func, None, lines)
+    assert len(warnings) == 2 and warnings[1].endswith(
+        'arguments of alias not documented, ' + message)
+    assert [record[0] for record in env.defaultargs_budgets.pop('doc')] == [
+        'func', 'alias']
+    warnings.clear()
+
+    # Records of parallel readers and of documents read again
+    other = types.SimpleNamespace(defaultargs_budgets={
+        'a': [('f', 'function', 'message')], 'b': []})
+    sphinx_autodoc_defaultargs.merge_budgets(app, env, ['a'], other)
+    assert env.defaultargs_budgets == {'a': [('f', 'function', 'message')]}
+    sphinx_autodoc_defaultargs.purge_budgets(app, env, 'a')
+    assert env.defaultargs_budgets == {}
+
+
+def test_merge_instrumentation():
+    env = types.SimpleNamespace(defaultargs_records={'a': [1]},
+                                defaultargs_profiles={})
+    other = types.SimpleNamespace(
+        defaultargs_records={'a': [2], 'b': [3], 'c': [4]},
+        defaultargs_profiles={'b': {}})
+    sphinx_autodoc_defaultargs.merge_instrumentation(
+        None, env, ['b', 'c'], other)
+    assert env.defaultargs_records == {'a': [1], 'b': [3], 'c': [4]}
+    assert env.defaultargs_profiles == {'b': {}}
+
+    counts = {'Signature': 2, 'find_arg': 1}
+    report = instrument.report({
+        'b': [('f', 'function', 2., {'Signature': 1})],
+        'c': [('g', 'method', 3., counts)],
+    }, top=1)
+    assert report == dict(
+        objects=2, seconds=5., counters={'Signature': 3, 'find_arg': 1},
+        documents={'b': 2., 'c': 3.},
+        slowest=[dict(name='g', what='method', docname='c', seconds=3.,
+                      counts=counts)])
+
+
+@pytest.mark.sphinx('text', testroot='dummy', confoverrides={
+    'docstring_default_arg_instrumentation': True,
+    'docstring_default_arg_instrumentation_profile': True})
+def test_instrumentation(app, status):
+    try:
+        app.build()
+    finally:
+        instrument.enabled = False
+        instrument.profiler = None
+
+    outdir = pathlib.Path(app.outdir)
+    report = json.loads((outdir / 'defaultargs_report.json').read_text())
+    assert report['objects'] > 10 and report['documents'].keys() == {'index'}
+    counters = report['counters']
+    assert counters['match_field'] > counters['Signature'] > 0
+    assert len(report['slowest']) == 10
+    assert report['slowest'][0]['seconds'] >= report['slowest'][-1]['seconds']
+    assert 'objects processed' in status.getvalue()
+
+    stats = pstats.Stats(str(outdir / 'defaultargs.prof'))
+    assert any(func == '_process_docstring' for _, _, func in stats.stats)
+
+
+@pytest.mark.sphinx('text', testroot='dummy', confoverrides={
+    'docstring_default_arg_index': True})
+def test_default_arg_index_build(app, status):
+    app.build()
+    assert ' objects indexed in ' in status.getvalue()
+    index = sphinx_autodoc_defaultargs.DefaultArgsIndex.load(
+        str(app.outdir / 'defaultargs.inv'))
+    assert index.defaults('dummy_module.func') == {'x': 'None', 'y': 'None'}
+    assert index.parameters(
+        'dummy_module.TestClassWithArgs.method_with_args') == [
+        ('a', 'POSITIONAL_OR_KEYWORD', None),
+        ('x', 'POSITIONAL_OR_KEYWORD', '0'),
+        ('args', 'VAR_POSITIONAL', None)]
+
+
+@pytest.mark.sphinx('text', testroot='dummy', confoverrides={
+    'docstring_default_arg_max_params': 1})
+def test_budgets_report(app, status, warning):
+    app.build()
+    assert 'not documented, 2 default arguments exceeding' in (
+        warning.getvalue())
+    report = status.getvalue().split(' objects exceeded a budget\n')[1]
+    assert 'function dummy_module.func (index): 2 default arguments' in (
+        report)
+
+
+def test_command_line(tmp_path, capsys):
+    conf = pathlib.Path(__file__).parent / 'roots' / 'test-dummy' / 'conf.py'
+    assert sphinx_autodoc_defaultargs.main(
+        ['-c', str(conf), 'dummy_module']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result['dummy_module.func']['what'] == 'function'
+    assert '   |default| :code:`None`' in '\n'.join(
+        result['dummy_module.func']['lines'])
+    assert result['dummy_module.TestClassWithReturn']['what'] == 'class'
+    # Private classes and objects without default arguments are left out
+    assert not any('__TestClass' in name for name in result)
+    assert 'dummy_module.TestClassWithArgs' not in result
+
+    output = tmp_path / 'out.rst'
+    assert sphinx_autodoc_defaultargs.main(
+        ['-c', str(conf), '-f', 'rst', '-o', str(output), 'dummy_module']) == 0
+    rst = output.read_text()
+    assert rst.startswith('dummy_module\n============\n')
+    assert '.. py:function:: dummy_module.func\n' in rst
+
+
+def test_command_line_package(tmp_path, capsys, monkeypatch):
+    package = tmp_path / 'cli_package'
+    (package / '_private').mkdir(parents=True)
+    (package / '__init__.py').write_text('')
+    (package / '_private' / '__init__.py').write_text('def f(x=1): pass\n')
+    for i in range(3):
+        (package / 'mod_{}.py'.format(i)).write_text(textwrap.dedent('''\
+            def f(x={}):
+                """Summary.
+
+                Args:
+                    x: Description. [default: 1]
+                """
+            '''.format(i)))
+    (package / 'broken.py').write_text('def f(:\n')
+    (tmp_path / 'pyproject.toml').write_text(textwrap.dedent('''\
+        [tool.sphinx_autodoc_defaultargs]
+        extensions = ["sphinx.ext.napoleon"]
+        docstring_default_arg_flags = [["[default: ", "]"]]
+        '''))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    results = []
+    for options in [['-j', '1'], ['-j', '2'], ['--no-import', '-j', '2']]:
+        assert sphinx_autodoc_defaultargs.main(
+            ['-c', str(tmp_path / 'pyproject.toml'), 'cli_package'] +
+            options) == 1
+        out, err = capsys.readouterr()
+        assert 'cli_package.broken: SyntaxError: ' in err
+        results.append(json.loads(out))
+    napoleon_config = tmp_path / 'napoleon.toml'
+    napoleon_config.write_text(
+        (tmp_path / 'pyproject.toml').read_text().replace(
+            '[tool.sphinx_autodoc_defaultargs]\n', '') +
+        'docstring_default_arg_napoleon = true\n')
+    assert sphinx_autodoc_defaultargs.main(
+        ['-c', str(napoleon_config), 'cli_package']) == 1
+    # With the type fields after the parameters
+    assert {name: sorted(result['lines']) for name, result in json.loads(
+        capsys.readouterr()[0]).items()} == {
+        name: sorted(result['lines']) for name, result in results[0].items()}
+    assert results[0] == results[1] == results[2]
+    assert list(results[0]) == ['cli_package.mod_{}.f'.format(i)
+                                for i in range(3)]
+    # Converted by napoleon, with the configured flag recognized
+    assert results[0]['cli_package.mod_2.f']['lines'] == [
+        'Summary.', '', ':type x: optional', ':param x: Description.',
+        '          |default| 1', '']
+
+    # Reported like the modules failing to import later
+    assert sphinx_autodoc_defaultargs.main(
+        ['cli_missing_package', 'cli_package.mod_0']) == 1
+    out, err = capsys.readouterr()
+    assert err.startswith('cli_missing_package: ModuleNotFoundError: ')
+    assert list(json.loads(out)) == ['cli_package.mod_0.f']
+
+
+def test_warm_up(tmp_path, monkeypatch):
+    package = tmp_path / 'warmup_package'
+    package.mkdir()
+    (package / '__init__.py').write_text('def f(x=0): pass\n')
+    (package / 'mod.py').write_text(textwrap.dedent('''\
+        class C(object):
+            def __init__(self, x=0):
+                pass
+
+            @staticmethod
+            def g(y=None):
+                pass
+
+            def h(self):
+                pass
+
+            @classmethod
+            def k(cls, z=1):
+                pass
+
+
+        class D(object):
+            pass
+        '''))
+    (package / 'broken.py').write_text('raise ImportError\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    app = ConfigApp(docstring_default_arg_warmup=[
+        'warmup_package', 'no_such_package'])
+    app.parallel = 1
+    introspect = sphinx_autodoc_defaultargs.introspect
+    warnings = []
+    monkeypatch.setattr(sphinx_autodoc_defaultargs.logger, 'warning',
+                        lambda message, *args: warnings.append(message % args))
+    infos = []
+    monkeypatch.setattr(sphinx_autodoc_defaultargs.logger, 'info',
+                        lambda message, *args: infos.append(args))
+
+    # Nothing to read
+    sphinx_autodoc_defaultargs.warm_up(app, None, [])
+    assert 'warmup_package' not in sys.modules
+
+    introspect.clear()
+    sphinx_autodoc_defaultargs.warm_up(app, None, ['index'])
+    from warmup_package import f, mod
+
+    # Only the callables kept, not object.__init__ of D
+    assert len(introspect) == infos[-1][0] == 5
+    for func in [f, mod.C.__init__, mod.C.g, mod.C.k]:
+        assert introspect(func).default_args
+    assert introspect(mod.C.g).is_static
+    assert introspect.hits == 5
+
+    # The classmethod, bound anew, is processed with the results
+    misses = introspect.misses
+    lines = [':param z: Size.']
+    process_docstring(ConfigApp(), 'method', 'mod.C.k', mod.C.k, None, lines)
+    assert introspect.misses == misses
+    assert lines == [':type z: optional', ':param z: Size.',
+                     '          |default| :code:`1`']
+    assert [warning.split(' import ')[1] for warning in warnings] == [
+        'warmup_package.broken to warm up: ImportError: ',
+        "no_such_package to warm up: ModuleNotFoundError: "
+        "No module named 'no_such_package'"]
+
+    # Not beyond the size of the cache
+    introspect.clear()
+    monkeypatch.setattr(introspect, 'maxsize', 2)
+    sphinx_autodoc_defaultargs.warm_up(app, None, ['index'])
+    assert len(introspect) == 2
+
+
+def napoleon_docstrings(rng, count):
+    """Generated Google and NumPy style docstrings of
+    ``napoleon_function``, single blank lines between paragraphs."""
+    paragraphs = [['Text.'], ['Two', 'lines.'], ['.. note:: Note.'],
+                  ['Text. (Default: ``1``)'], ['(Default:', '``2``)'],
+                  ['- Item.']]
+    for i in range(count):
+        fields = []
+        for name in ['a', 'x', 'y', 'z']:
+            if rng.random() < 0.8:
+                desc = []
+                for _ in range(rng.randint(0, 3)):
+                    desc += [''] + rng.choice(paragraphs)
+                fields.append((name, rng.choice(['', 'int']),
+                               desc[rng.choice([0, 1]):]))
+        lines = ['Summary.', '']
+        if i % 2:
+            lines += ['Parameters', '----------']
+            for name, type_text, desc in fields:
+                lines.append(name + (' : ' + type_text if type_text else ''))
+                lines += ['    ' + line if line else '' for line in desc]
+            lines += ['', 'Returns', '-------', 'None']
+        else:
+            lines.append('Args:')
+            for name, type_text, desc in fields:
+                lines.append('    {}{}: {}'.format(
+                    name, ' ({})'.format(type_text) if type_text else '',
+                    desc[0] if desc else '').rstrip())
+                lines += ['        ' + line if line else ''
+                          for line in desc[1:]]
+            if rng.random() < 0.5:
+                lines += ['', 'Returns:', '    Nothing.']
+        yield lines
+
+
+def napoleon_function(a, x=0, y=None, z='s'):
+    pass
+
+
+def rendered_fields(lines):
+    """The fields of ``lines`` as parsed by docutils, with the text
+    of each element of their body, and the other elements."""
+    from docutils import nodes
+    from docutils.core import publish_doctree
+
+    doctree = publish_doctree('\n'.join(lines), settings_overrides={
+        'report_level': 5, 'halt_level': 5})
+    fields, types, others = [], {}, []
+    for node in doctree.children:
+        if not isinstance(node, nodes.field_list):
+            others.append(node.astext())
+            continue
+        for field in node.children:
+            name = field[0].astext()
+            body = [(child.tagname, ' '.join(child.astext().split()))
+                    for child in field[1].children
+                    if not isinstance(child, nodes.system_message)]
+            if name.startswith(('type ', 'kwtype ')):
+                types[name] = body
+            else:
+                fields.append((name, body))
+    return fields, types, others
+
+
+@pytest.mark.parametrize('after_directives', [False, True])
+@pytest.mark.parametrize('always_document_default_args', [False, True])
+def test_napoleon_modes(after_directives, always_document_default_args):
+    from sphinx.ext.napoleon import Config
+    from sphinx.ext.napoleon.docstring import GoogleDocstring, NumpyDocstring
+
+    config = {name: default for name, (default, _)
+              in Config._config_values.items()}
+    config.update(
+        always_document_default_args=always_document_default_args,
+        docstring_default_arg_after_directives=after_directives)
+    napoleon_config = Config(**{name: value for name, value in config.items()
+                                if name.startswith('napoleon_')})
+    rng = random.Random(0)
+    for i, lines in enumerate(napoleon_docstrings(rng, 50)):
+        # Converted by napoleon, then processed as text
+        docstring = NumpyDocstring if i % 2 else GoogleDocstring
+        text = docstring(list(lines), napoleon_config, None, 'function',
+                         'func', napoleon_function).lines()
+        sphinx_autodoc_defaultargs.introspect.clear()
+        process_docstring(ConfigApp(**config), 'function', 'func',
+                          napoleon_function, None, text)
+
+        sphinx_autodoc_defaultargs.introspect.clear()
+        parsed = list(lines)
+        sphinx_autodoc_defaultargs.process_napoleon_docstring(
+            ConfigApp(docstring_default_arg_napoleon=True, **config),
+            'function', 'func', napoleon_function, None, parsed)
+        assert rendered_fields(parsed) == rendered_fields(text), lines
+
+
+def test_process_napoleon_docstring(monkeypatch):
+    from sphinx.ext.napoleon import Config
+
+    app = ConfigApp(**{name: default for name, (default, _)
+                       in Config._config_values.items()})
+    calls = []
+    monkeypatch.setattr(sphinx_autodoc_defaultargs, 'process_lines',
+                        lambda *args: calls.append(args))
+
+    def func(a, x=0, y=None):
+        pass
+
+    lines = ['Summary.', '', 'Args:', '    a: No default.',
+             '    x (int): Description. (Default: ``1``)',
+             '    y: Description.', '        More.']
+    sphinx_autodoc_defaultargs.process_napoleon_docstring(
+        app, 'function', 'func', func, None, lines)
+    assert lines == ['Summary.', '', ':param a: No default.',
+                     ':param x: Description.', '          |default| ``1``',
+                     ':type x: int, optional',
+                     ':param y: Description.', '          More.',
+                     '          |default| :code:`None`',
+                     ':type y: optional', '']
+    # All default arguments were documented
+    assert not calls
+
+    lines = ['Args:', '    a: No default.']
+    sphinx_autodoc_defaultargs.process_napoleon_docstring(
+        app, 'function', 'func', func, None, lines)
+    assert lines == [':param a: No default.', ''] and len(calls) == 1
+
+    def func(x_=0):
+        pass
+
+    # After the first paragraph, or the last one, like in the text
+    # where the blank line after the section is part of the field
+    lines = ['Args:', '    x_: One.', '', '        Two.']
+    for after_directives, expected in [
+            (False, [':param x_: One.', '           |default| :code:`0`',
+                     '', '           Two.']),
+            (True, [':param x_: One.', '', '           Two.', '',
+                    '           |default| :code:`0`'])]:
+        app.config.docstring_default_arg_after_directives = after_directives
+        result = list(lines)
+        sphinx_autodoc_defaultargs.process_napoleon_docstring(
+            app, 'function', 'func', func, None, result)
+        assert result == expected + [':type x_: optional', '']
+
+    # Builtins without a signature are converted only
+    no_signature = sphinx_autodoc_defaultargs.no_signature
+    no_signature.clear()
+    for _ in range(2):
+        lines = ['Args:', '    iterable: Values.']
+        sphinx_autodoc_defaultargs.process_napoleon_docstring(
+            app, 'function', 'max', max, None, lines)
+        assert lines == [':param iterable: Values.', '']
+    assert no_signature.hits == 1 and max in no_signature
+
+
 @pytest.mark.parametrize('always_document_default_args', [False, True])
 @pytest.mark.sphinx('text', testroot='dummy')
 def test_sphinx_output(app, status, warning, always_document_default_args):